@@ -71,13 +71,15 @@ class CheckpointManager:
                     ['git', 'init'],
                     cwd=self.project_dir,
                     check=True,
-                    capture_output=True
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
                 )
                 # Set user if not configured
                 result = subprocess.run(
                     ['git', 'config', 'user.email'],
                     cwd=self.project_dir,
-                    capture_output=True
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
                 )
                 if result.returncode != 0:
                     subprocess.run(
@@ -138,7 +140,8 @@ class CheckpointManager:
                 ['git', 'add', '-A'],
                 cwd=self.project_dir,
                 check=True,
-                capture_output=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
             # Commit
@@ -146,7 +149,8 @@ class CheckpointManager:
                 ['git', 'commit', '-m', full_message],
                 cwd=self.project_dir,
                 check=True,
-                capture_output=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
             # Get commit hash
@@ -201,7 +205,8 @@ class CheckpointManager:
                 ['git', 'reset', mode, checkpoint.commit_hash],
                 cwd=self.project_dir,
                 check=True,
-                capture_output=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             return True
         except subprocess.CalledProcessError:
@@ -283,7 +288,8 @@ class CheckpointManager:
             subprocess.run(
                 ['git', 'rev-parse', 'HEAD'],
                 cwd=self.project_dir,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=5,
                 check=True
             )
@@ -49,12 +49,21 @@ def main():
     backlog.add_argument('--enable-lint', action='store_true', help='Enable lint checks (opt-in)')
     backlog.add_argument('--adaptive-prompting-patterns', type=int, default=5, help='Max learned patterns to inject (default: 5, 0=disable)')
     
+    # Prewarm
+    prewarm = subparsers.add_parser('prewarm', help='Bring up project infrastructure ahead of a run')
+    prewarm.add_argument('project_dir', type=Path, help='Project directory')
+    
     args = parser.parse_args()
     
     if not args.mode:
         parser.print_help()
         sys.exit(1)
     
+    if args.mode == 'prewarm':
+        from .infra.healer import prewarm as prewarm_infra
+        print("🔧 Prewarming infrastructure...")
+        sys.exit(0 if prewarm_infra(args.project_dir) else 1)
+    
     # Create harness
     harness = CursorHarness(
         project_dir=args.project_dir,
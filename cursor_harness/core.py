@@ -7,6 +7,7 @@ Extended for production use (brownfield, backlog, etc).
 Design: Keep it SIMPLE like Anthropic's demo (~300 lines)
 """
 
+import hashlib
 import json
 import subprocess
 import time
@@ -17,6 +18,8 @@ from datetime import datetime
 
 from . import __version__
 
+_PROMPTS_DIR = Path(__file__).parent / "prompts"
+
 
 @dataclass
 class WorkItem:
@@ -87,7 +90,6 @@ class CursorHarness:
         self.consecutive_failures = 0  # For auto-rollback
         
         # Generate session ID
-        import hashlib
         session_str = f"{project_dir}_{mode}_{self.start_time}"
         self.session_id = hashlib.md5(session_str.encode()).hexdigest()[:16]
         
@@ -124,6 +126,12 @@ class CursorHarness:
                 session_id=self.session_id
             )
     
+        # Prompt templates by file name (package files, fixed for the run)
+        self._prompt_cache: Dict[str, str] = {}
+        
+        # Parsed feature_list.json, reused while the file is unchanged
+        self._features_cache = None  # (mtime_ns, size, features)
+        
         # Track if this is first session (initializer) or coding session
         feature_list_exists = (self.project_dir / "feature_list.json").exists()
         self.is_first_session = not feature_list_exists
@@ -132,9 +140,7 @@ class CursorHarness:
         self.is_continuation = False
         if feature_list_exists:
             try:
-                import json
-                with open(self.project_dir / "feature_list.json") as f:
-                    features = json.load(f)
+                features = self._load_features()
                 # If >50 features, use continuation mode
                 if len(features) > 50:
                     self.is_continuation = True
@@ -257,21 +263,16 @@ class CursorHarness:
         git_dir = self.project_dir / ".git"
         if not git_dir.exists() and self.mode == "greenfield":
             print(f"   Initializing git...")
+            # Init + identity in one shell round-trip instead of three runs
             subprocess.run(
-                ["git", "init"],
+                "git init && "
+                "git config user.name cursor-harness && "
+                "git config user.email cursor-harness@local",
+                shell=True,
                 cwd=self.project_dir,
                 check=True,
-                capture_output=True
-            )
-            subprocess.run(
-                ["git", "config", "user.name", "cursor-harness"],
-                cwd=self.project_dir,
-                capture_output=True
-            )
-            subprocess.run(
-                ["git", "config", "user.email", "cursor-harness@local"],
-                cwd=self.project_dir,
-                capture_output=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
         
         # 3. Self-healing infrastructure (brownfield modes only)
@@ -330,18 +331,28 @@ class CursorHarness:
         print(f"   Backlog state file created")
     
     
+    def _load_features(self) -> list:
+        """
+        Parse feature_list.json, reusing the last parse while the file's
+        mtime and size are unchanged (it is checked every iteration but
+        only rewritten by the agent). Raises OSError/ValueError like json.load.
+        """
+        st = (self.project_dir / "feature_list.json").stat()
+        cached = self._features_cache
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        with open(self.project_dir / "feature_list.json") as f:
+            features = json.load(f)
+        self._features_cache = (st.st_mtime_ns, st.st_size, features)
+        return features
+    
     def _is_complete(self) -> bool:
         """Check if all features are complete (Anthropic's pattern)."""
 
         # Check feature_list.json
-        feature_list = self.project_dir / "feature_list.json"
-        if not feature_list.exists():
-            return False
-
         try:
-            import json
-            with open(feature_list) as f:
-                features = json.load(f)
+            features = self._load_features()
 
             if not features:
                 return True
@@ -360,14 +371,8 @@ class CursorHarness:
 
         Used for E2E verification.
         """
-        feature_list = self.project_dir / "feature_list.json"
-        if not feature_list.exists():
-            return None
-
         try:
-            import json
-            with open(feature_list) as f:
-                features = json.load(f)
+            features = self._load_features()
 
             # Find first non-passing feature
             for feature in features:
@@ -557,44 +562,40 @@ class CursorHarness:
         Returns:
             Appropriate prompt for mode and session
         """
-        from pathlib import Path
-        
-        prompts_dir = Path(__file__).parent / "prompts"
-        
         # Select prompt based on mode and session
         if self.is_first_session:
             # INITIALIZER prompts
             if self.mode == "enhancement" or self.mode == "enhance":
-                prompt_file = prompts_dir / "enhancement_initializer.md"
+                prompt_file = "enhancement_initializer.md"
             elif self.mode == "backlog":
-                prompt_file = prompts_dir / "backlog_initializer.md"
+                prompt_file = "backlog_initializer.md"
             else:  # greenfield
-                prompt_file = prompts_dir / "initializer.md"
+                prompt_file = "initializer.md"
         else:
             # CODING prompts - use continuation mode for large projects
             if self.mode == "enhancement" or self.mode == "enhance":
                 if self.is_continuation:
-                    prompt_file = prompts_dir / "enhancement_continuation.md"
+                    prompt_file = "enhancement_continuation.md"
                 else:
-                    prompt_file = prompts_dir / "enhancement_coding.md"
+                    prompt_file = "enhancement_coding.md"
             elif self.mode == "backlog":
                 if self.is_continuation:
-                    prompt_file = prompts_dir / "backlog_continuation.md"
+                    prompt_file = "backlog_continuation.md"
                 else:
-                    prompt_file = prompts_dir / "backlog_coding.md"
+                    prompt_file = "backlog_coding.md"
             else:  # greenfield
                 if self.is_continuation:
-                    prompt_file = prompts_dir / "continuation_coding.md"
+                    prompt_file = "continuation_coding.md"
                 else:
-                    prompt_file = prompts_dir / "coding.md"
+                    prompt_file = "coding.md"
         
-        prompt = prompt_file.read_text()
+        prompt = self._read_prompt(prompt_file)
 
         # Replace template variables with actual MCP tools
         prompt = self._inject_mcp_tools(prompt)
 
         # Add system instructions (common to all)
-        system_instructions = (prompts_dir / "system_instructions.md").read_text()
+        system_instructions = self._read_prompt("system_instructions.md")
         prompt = f"{prompt}\n\n---\n\n{system_instructions}"
 
         # Add project spec for initializer
@@ -609,6 +610,14 @@ class CursorHarness:
 
         return prompt
 
+    def _read_prompt(self, name: str) -> str:
+        """Read a template from prompts/, once per harness instance."""
+        prompt = self._prompt_cache.get(name)
+        if prompt is None:
+            prompt = (_PROMPTS_DIR / name).read_text()
+            self._prompt_cache[name] = prompt
+        return prompt
+    
     def _inject_mcp_tools(self, prompt: str) -> str:
         """
         Replace template variables with actual MCP tool names.
@@ -5,14 +5,37 @@ Uses cursor-agent CLI with streaming output.
 Reference: https://cursor.com/docs/cli/using
 """
 
+import os
+import re
+import selectors
+import shutil
 import subprocess
-import tempfile
+import sys
 import json
 import signal
 import atexit
+import time
 import weakref
 from pathlib import Path
 
+try:
+    import orjson as _json  # Optional: much faster NDJSON parsing
+except ImportError:
+    _json = json
+
+# Bytes of cursor-agent stderr retained for the error report
+_STDERR_KEEP = 4096
+
+# Minimum seconds between "Generating: N chars" progress redraws
+_PROGRESS_INTERVAL = 0.1
+
+# Event types the stream loop acts on; other compact events skip the JSON parse
+_INTERESTING = re.compile(rb'"type":"(?:system|assistant|tool_call|result)"')
+
+# Decorative per-event output; CURSOR_HARNESS_VERBOSE=0 skips the formatting
+# entirely (CI / library use). Errors and loop warnings are always printed.
+VERBOSE = os.environ.get("CURSOR_HARNESS_VERBOSE", "1").strip().lower() not in ("0", "false", "no", "off", "")
+
 # Global registry of active cursor-agent processes
 _active_processes: weakref.WeakSet = weakref.WeakSet()
 
@@ -34,10 +57,73 @@ def _signal_handler(signum, frame):
     """Handle interrupt signals gracefully."""
     print(f"\n🛑 Received signal {signum}, cleaning up cursor-agent processes...")
     _cleanup_all_processes()
-    import sys
     sys.exit(0)
 
 
+def _dig(d, *keys):
+    """Walk nested dicts without allocating empty defaults; None if any hop is missing."""
+    for key in keys:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(key)
+        if d is None:
+            return None
+    return d
+
+
+def _write_all(fd: int, data: bytes):
+    """Write bytes to a blocking fd, bypassing the buffered writer's copy."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _iter_lines(process, stderr_sink: list, deadline: float,
+                chunk_size: int = 65536, keep: int = _STDERR_KEEP):
+    """
+    Yield newline-delimited stdout lines while draining stderr.
+
+    Both pipes are multiplexed with selectors on this thread, so the child
+    never blocks on a full stderr pipe and no drain thread is needed. Only
+    the first `keep` bytes of stderr are retained (that is all we print).
+    Raises subprocess.TimeoutExpired once time.monotonic() passes `deadline`.
+    """
+    out_fd = process.stdout.fileno()
+    err_fd = process.stderr.fileno()
+    started = time.monotonic()
+    sel = selectors.DefaultSelector()
+    sel.register(out_fd, selectors.EVENT_READ)
+    sel.register(err_fd, selectors.EVENT_READ)
+    pending = b''
+    kept = 0
+    try:
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(process.args, deadline - started)
+            for key, _ in sel.select(remaining):
+                fd = key.fd
+                chunk = os.read(fd, chunk_size)
+                if not chunk:
+                    sel.unregister(fd)
+                elif fd == err_fd:
+                    if kept < keep:
+                        chunk = chunk[:keep - kept]
+                        stderr_sink.append(chunk)
+                        kept += len(chunk)
+                else:
+                    data = pending + chunk if pending else chunk
+                    start = 0
+                    while (nl := data.find(b'\n', start)) != -1:
+                        yield data[start:nl]
+                        start = nl + 1
+                    pending = data[start:]
+    finally:
+        sel.close()
+    if pending:
+        yield pending
+
+
 # Register cleanup on program exit
 atexit.register(_cleanup_all_processes)
 
@@ -63,6 +149,74 @@ class CursorExecutor:
                 "  npm install -g @cursor/agent\n"
                 "  cursor-agent login"
             )
+
+        # Resolve the binary once: an absolute path spares the child an
+        # execvp() walk over $PATH on every spawn and, with no preexec_fn,
+        # keeps subprocess on its vfork/posix_spawn fast path.
+        self.agent_path = shutil.which("cursor-agent") or "cursor-agent"
+    
+    def _on_write_started(self, call: dict, tool_count: int) -> bool:
+        path = _dig(call, 'args', 'path') or 'unknown'
+        if VERBOSE:
+            self._out(f"\n   🔧 Tool #{tool_count}: Writing {path}\n")
+        if self.loop_detector:
+            self.loop_detector.track_tool('write', path)
+        return False
+
+    def _on_read_started(self, call: dict, tool_count: int) -> bool:
+        path = _dig(call, 'args', 'path') or 'unknown'
+        if VERBOSE:
+            self._out(f"\n   📖 Tool #{tool_count}: Reading {path}\n")
+        if self.loop_detector:
+            self.loop_detector.track_tool('read', path)
+            # Check for loops
+            is_stuck, reason = self.loop_detector.check()
+            if is_stuck:
+                self._out(f"\n   ⚠️  LOOP DETECTED: {reason}\n")
+                return True
+        return False
+
+    def _on_edit_started(self, call: dict, tool_count: int) -> bool:
+        path = _dig(call, 'args', 'path') or 'unknown'
+        if VERBOSE:
+            self._out(f"\n   ✏️  Tool #{tool_count}: Editing {path}\n")
+        if self.loop_detector:
+            self.loop_detector.track_tool('edit', path)
+        return False
+
+    def _on_bash_started(self, call: dict, tool_count: int) -> bool:
+        cmd = _dig(call, 'args', 'command') or 'unknown'
+        if VERBOSE:
+            self._out(f"\n   💻 Tool #{tool_count}: Running {cmd[:50]}\n")
+        if self.loop_detector:
+            self.loop_detector.track_tool('bash')
+        return False
+
+    def _on_write_completed(self, call: dict):
+        if not VERBOSE:
+            return
+        result = _dig(call, 'result', 'success') or {}
+        lines = result.get('linesCreated', 0)
+        size = result.get('fileSize', 0)
+        self._out(f"      ✅ Created {lines} lines ({size} bytes)\n")
+
+    def _on_read_completed(self, call: dict):
+        if not VERBOSE:
+            return
+        lines = _dig(call, 'result', 'success', 'totalLines') or 0
+        self._out(f"      ✅ Read {lines} lines\n")
+
+    # Tool-call kind -> handler; started handlers return True to stop the session
+    _STARTED_HANDLERS = {
+        'writeToolCall': _on_write_started,
+        'readToolCall': _on_read_started,
+        'editToolCall': _on_edit_started,
+        'bashToolCall': _on_bash_started,
+    }
+    _COMPLETED_HANDLERS = {
+        'writeToolCall': _on_write_completed,
+        'readToolCall': _on_read_completed,
+    }
     
     def execute(self, prompt: str, timeout_seconds: int = 3600) -> bool:
         """Execute a session using cursor-agent."""
@@ -71,24 +225,15 @@ class CursorExecutor:
         if self.loop_detector:
             self.loop_detector.reset()
 
-        # Write prompt to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write(prompt)
-            prompt_file = f.name
-
         process = None
         try:
             print(f"   🚀 Starting cursor-agent session...")
 
-            # Read prompt from file
-            with open(prompt_file, 'r') as pf:
-                prompt_text = pf.read()
-
             # Start cursor-agent process
             # Pass prompt via stdin to avoid argument length limits
             process = subprocess.Popen(
                 [
-                    "cursor-agent",
+                    self.agent_path,
                     "-p",
                     "--force",
                     "--model", self.model,
@@ -99,104 +244,105 @@ class CursorExecutor:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                bufsize=0  # Pipes are read with os.read() on the raw fds
             )
 
             # Track process for global cleanup
             _active_processes.add(process)
 
-            # Write prompt to stdin
-            process.stdin.write(prompt_text)
+            stderr_chunks = []
+
+            # Write prompt to stdin (encoded once, straight to the raw fd)
+            _write_all(process.stdin.fileno(), prompt.encode('utf-8'))
             process.stdin.close()
 
-            # Stream and parse output
+            # Stream and parse output (bare writes; print() is costly per event)
+            out = self._out = sys.stdout.write
             tool_count = 0
-            accumulated_text = ""
+            generated_chars = 0
+            shown_chars = 0  # Count last drawn; the throttle can leave it behind
+            last_progress = 0.0
+            # One budget for streaming and the final wait()
+            deadline = time.monotonic() + timeout_seconds
 
             try:
-                for line in process.stdout:
-                    line = line.strip()
+                for line in _iter_lines(process, stderr_chunks, deadline):
+                    # Lines arrive already split on b'\n'; cursor-agent emits
+                    # compact JSON, so only a CRLF remnant needs trimming
+                    if line.endswith(b'\r'):
+                        line = line[:-1]
                     if not line:
                         continue
+                    if (line[:1] == b'{' and b'"type":"' in line
+                            and not _INTERESTING.search(line)):
+                        continue
 
                     try:
-                        event = json.loads(line)
+                        event = _json.loads(line)
                         event_type = event.get('type', '')
                         subtype = event.get('subtype', '')
 
                         # Handle different event types
                         if event_type == 'system' and subtype == 'init':
-                            model = event.get('model', 'unknown')
-                            print(f"   🤖 Model: {model}")
+                            if VERBOSE:
+                                model = event.get('model', 'unknown')
+                                out(f"   🤖 Model: {model}\n")
 
                         elif event_type == 'assistant':
-                            content = event.get('message', {}).get('content', [])
-                            if content and len(content) > 0:
-                                text = content[0].get('text', '')
-                                accumulated_text += text
-                                if len(accumulated_text) % 100 == 0:
-                                    print(f"\r   📝 Generating: {len(accumulated_text)} chars", end='', flush=True)
+                            if not VERBOSE:
+                                continue
+                            content = _dig(event, 'message', 'content')
+                            if content:
+                                text = content[0].get('text') or ''
+                                generated_chars += len(text)
+                                now = time.monotonic()
+                                if now - last_progress >= _PROGRESS_INTERVAL:
+                                    last_progress = now
+                                    shown_chars = generated_chars
+                                    out(f"\r   📝 Generating: {generated_chars} chars")
+                                    sys.stdout.flush()
 
                         elif event_type == 'tool_call':
                             if subtype == 'started':
                                 tool_count += 1
-                                tool_call = event.get('tool_call', {})
-
-                                # Track tool for loop detection
-                                if 'writeToolCall' in tool_call:
-                                    path = tool_call['writeToolCall'].get('args', {}).get('path', 'unknown')
-                                    print(f"\n   🔧 Tool #{tool_count}: Writing {path}")
-                                    if self.loop_detector:
-                                        self.loop_detector.track_tool('write', path)
-
-                                elif 'readToolCall' in tool_call:
-                                    path = tool_call['readToolCall'].get('args', {}).get('path', 'unknown')
-                                    print(f"\n   📖 Tool #{tool_count}: Reading {path}")
-                                    if self.loop_detector:
-                                        self.loop_detector.track_tool('read', path)
-                                        # Check for loops
-                                        is_stuck, reason = self.loop_detector.check()
-                                        if is_stuck:
-                                            print(f"\n   ⚠️  LOOP DETECTED: {reason}")
-                                            print(f"   Stopping session...")
+                                tool_call = event.get('tool_call') or ()
+
+                                # Dispatch on the tool kind (tracks loops, may stop session)
+                                for kind in tool_call:
+                                    handler = self._STARTED_HANDLERS.get(kind)
+                                    if handler:
+                                        if handler(self, tool_call[kind], tool_count):
+                                            out("   Stopping session...\n")
                                             process.kill()
                                             return False
-
-                                elif 'editToolCall' in tool_call:
-                                    path = tool_call['editToolCall'].get('args', {}).get('path', 'unknown')
-                                    print(f"\n   ✏️  Tool #{tool_count}: Editing {path}")
-                                    if self.loop_detector:
-                                        self.loop_detector.track_tool('edit', path)
-
-                                elif 'bashToolCall' in tool_call:
-                                    cmd = tool_call['bashToolCall'].get('args', {}).get('command', 'unknown')
-                                    print(f"\n   💻 Tool #{tool_count}: Running {cmd[:50]}")
-                                    if self.loop_detector:
-                                        self.loop_detector.track_tool('bash')
+                                        break
 
                             elif subtype == 'completed':
-                                tool_call = event.get('tool_call', {})
-
-                                if 'writeToolCall' in tool_call:
-                                    result = tool_call['writeToolCall'].get('result', {}).get('success', {})
-                                    lines = result.get('linesCreated', 0)
-                                    size = result.get('fileSize', 0)
-                                    print(f"      ✅ Created {lines} lines ({size} bytes)")
+                                tool_call = event.get('tool_call') or ()
 
-                                elif 'readToolCall' in tool_call:
-                                    result = tool_call['readToolCall'].get('result', {}).get('success', {})
-                                    lines = result.get('totalLines', 0)
-                                    print(f"      ✅ Read {lines} lines")
+                                for kind in tool_call:
+                                    handler = self._COMPLETED_HANDLERS.get(kind)
+                                    if handler:
+                                        handler(self, tool_call[kind])
+                                        break
 
                         elif event_type == 'result':
+                            if shown_chars != generated_chars:  # Final count, unthrottled
+                                shown_chars = generated_chars
+                                out(f"\r   📝 Generating: {generated_chars} chars")
                             duration = event.get('duration_ms', 0)
-                            print(f"\n   ⏱️  Session: {duration}ms ({tool_count} tools)")
+                            out(f"\n   ⏱️  Session: {duration}ms ({tool_count} tools)\n")
+
+                    except ValueError:  # json/orjson JSONDecodeError
+                        out(f"   {line.decode('utf-8', 'replace')}\n")
 
-                    except json.JSONDecodeError:
-                        print(f"   {line}")
+                if shown_chars != generated_chars:  # No result event: redraw the final count
+                    out(f"\r   📝 Generating: {generated_chars} chars\n")
+                sys.stdout.flush()
 
-                # Wait for process to complete
-                returncode = process.wait(timeout=timeout_seconds)
+                # Wait for process to complete (stdout is at EOF; only what is
+                # left of the session timeout applies)
+                returncode = process.wait(timeout=max(0.0, deadline - time.monotonic()))
 
                 if returncode == 0:
                     print(f"\n   ✅ Session successful!")
@@ -204,7 +350,7 @@ class CursorExecutor:
                 else:
                     print(f"\n   ⚠️  Session exited with code {returncode}")
                     # Read stderr to see what went wrong
-                    stderr = process.stderr.read()
+                    stderr = b''.join(stderr_chunks).decode('utf-8', 'replace')
                     if stderr:
                         print(f"\n   ERROR OUTPUT:")
                         print(f"   {stderr[:500]}")
@@ -252,5 +398,3 @@ class CursorExecutor:
                 print(f"   Final cleanup: killing cursor-agent...")
                 process.kill()
                 process.wait()
-            # Cleanup temp file
-            Path(prompt_file).unlink(missing_ok=True)
@@ -10,9 +10,29 @@ Based on sr developer insight:
 """
 
 import json
+import os
 import subprocess
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parsed hooks.json per path, tagged with the (st_mtime_ns, st_size) it was read at
+_HOOKS_CACHE: Dict[str, Tuple[int, int, Dict]] = {}
+
+
+def _write_script(path: Path, body: str):
+    """Write an executable hook script in a single open/write."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    try:
+        # The creat() mode is umask-masked and ignored for existing files
+        os.fchmod(fd, 0o755)
+        os.write(fd, body.encode('utf-8'))
+    finally:
+        os.close(fd)
 
 
 class HooksManager:
@@ -31,11 +51,21 @@ class HooksManager:
         self.hooks = self._load_hooks()
     
     def _load_hooks(self) -> Dict:
-        """Load hooks from .cursor/hooks.json."""
-        if self.hooks_file.exists():
-            with open(self.hooks_file) as f:
-                return json.load(f)
-        return {}
+        """Load hooks from .cursor/hooks.json (parsed once per file version)."""
+        try:
+            st = self.hooks_file.stat()
+        except FileNotFoundError:
+            return {}
+        
+        path = str(self.hooks_file)
+        cached = _HOOKS_CACHE.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        raw = self.hooks_file.read_bytes()
+        hooks = orjson.loads(raw) if orjson else json.loads(raw)
+        _HOOKS_CACHE[path] = (st.st_mtime_ns, st.st_size, hooks)
+        return hooks
     
     def setup_default_hooks(self):
         """
@@ -50,6 +80,10 @@ class HooksManager:
         hooks_dir = self.project_dir / "hooks"
         hooks_dir.mkdir(exist_ok=True)
         
+        # One directory listing instead of a stat() per project marker file
+        with os.scandir(self.project_dir) as entries:
+            project_files = {entry.name for entry in entries}
+        
         # Cursor hooks.json format (from docs)
         hooks_config = {
             "version": 1,
@@ -62,7 +96,7 @@ class HooksManager:
         
         # CRITICAL: Secrets scanner before git commit
         secrets_hook = hooks_dir / "block-secrets.sh"
-        secrets_hook.write_text("""#!/bin/bash
+        _write_script(secrets_hook, """#!/bin/bash
 # Block git commits if secrets detected
 # Based on Cursor hooks spec: https://cursor.com/docs/agent/hooks
 
@@ -104,7 +138,6 @@ cat << 'EOF'
 EOF
 exit 0
 """)
-        secrets_hook.chmod(0o755)
         
         hooks_config["hooks"]["beforeShellExecution"].append({
             "command": "./hooks/block-secrets.sh"
@@ -112,7 +145,7 @@ exit 0
         
         # Git workflow validation hook
         git_validate_hook = hooks_dir / "git-workflow.sh"
-        git_validate_hook.write_text("""#!/bin/bash
+        _write_script(git_validate_hook, """#!/bin/bash
 # Validate before git commit
 # Runs linting, security checks, tests
 
@@ -158,22 +191,20 @@ cat << 'EOF'
 EOF
 exit 0
 """)
-        git_validate_hook.chmod(0o755)
         
         hooks_config["hooks"]["beforeShellExecution"].append({
             "command": "./hooks/git-workflow.sh"
         })
         
         # Python project
-        if (self.project_dir / "requirements.txt").exists():
+        if "requirements.txt" in project_files:
             # After edit: run tests
             test_script = hooks_dir / "run-tests.sh"
-            test_script.write_text("""#!/bin/bash
+            _write_script(test_script, """#!/bin/bash
 # Auto-run pytest after file edits
 pytest --tb=short -x || true
 exit 0
 """)
-            test_script.chmod(0o755)
             
             hooks_config["hooks"]["afterFileEdit"].append({
                 "command": "./hooks/run-tests.sh"
@@ -181,27 +212,25 @@ exit 0
             
             # On stop: coverage check
             cov_script = hooks_dir / "coverage-check.sh"
-            cov_script.write_text("""#!/bin/bash
+            _write_script(cov_script, """#!/bin/bash
 # Run coverage on session stop
 pytest --cov --cov-report=term-missing || true
 exit 0
 """)
-            cov_script.chmod(0o755)
             
             hooks_config["hooks"]["stop"].append({
                 "command": "./hooks/coverage-check.sh"
             })
         
         # TypeScript/JavaScript project
-        if (self.project_dir / "package.json").exists():
+        if "package.json" in project_files:
             # After edit: eslint
             lint_script = hooks_dir / "eslint.sh"
-            lint_script.write_text("""#!/bin/bash
+            _write_script(lint_script, """#!/bin/bash
 # Auto-run eslint after file edits
 npm run lint || true
 exit 0
 """)
-            lint_script.chmod(0o755)
             
             hooks_config["hooks"]["afterFileEdit"].append({
                 "command": "./hooks/eslint.sh"
@@ -209,28 +238,26 @@ exit 0
             
             # On stop: build
             build_script = hooks_dir / "build.sh"
-            build_script.write_text("""#!/bin/bash
+            _write_script(build_script, """#!/bin/bash
 # Build on session stop
 npm run build || true
 exit 0
 """)
-            build_script.chmod(0o755)
             
             hooks_config["hooks"]["stop"].append({
                 "command": "./hooks/build.sh"
             })
         
         # Go project
-        if (self.project_dir / "go.mod").exists():
+        if "go.mod" in project_files:
             # After edit: gofmt + go vet
             fmt_script = hooks_dir / "go-check.sh"
-            fmt_script.write_text("""#!/bin/bash
+            _write_script(fmt_script, """#!/bin/bash
 # Auto-format and vet Go code
 gofmt -w . || true
 go vet ./... || true
 exit 0
 """)
-            fmt_script.chmod(0o755)
             
             hooks_config["hooks"]["afterFileEdit"].append({
                 "command": "./hooks/go-check.sh"
@@ -238,12 +265,11 @@ exit 0
             
             # On stop: tests
             test_script = hooks_dir / "go-test.sh"
-            test_script.write_text("""#!/bin/bash
+            _write_script(test_script, """#!/bin/bash
 # Run Go tests on session stop
 go test ./... || true
 exit 0
 """)
-            test_script.chmod(0o755)
             
             hooks_config["hooks"]["stop"].append({
                 "command": "./hooks/go-test.sh"
@@ -251,8 +277,15 @@ exit 0
         
         # Save hooks.json
         self.hooks_file.parent.mkdir(exist_ok=True, parents=True)
-        with open(self.hooks_file, 'w') as f:
-            json.dump(hooks_config, f, indent=2)
+        if orjson:
+            payload = orjson.dumps(hooks_config, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(hooks_config, indent=2).encode()
+        # Write-then-rename: a crash mid-write never leaves a truncated hooks.json
+        # behind for cursor-agent (or the next _load_hooks) to choke on
+        tmp = self.hooks_file.with_suffix(".json.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, self.hooks_file)
         
         hook_count = len(hooks_config["hooks"]["afterFileEdit"]) + len(hooks_config["hooks"]["stop"])
         print(f"   ✅ Hooks configured ({hook_count} total - cursor-agent will auto-run them)")
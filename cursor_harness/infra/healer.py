@@ -1,111 +1,222 @@
 """Infrastructure self-healing."""
 
+import atexit
+import json
+import shutil
+import socket
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+def check_port_available(port: int, host: str = "localhost", timeout: float = 0.2) -> bool:
+    """True if nothing accepts connections on host:port within `timeout` seconds."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return False
+    except OSError:
+        return True
+
+
 class InfrastructureHealer:
     """Auto-fix infrastructure issues."""
     
+    # Shared by every healer; threads start on first submit and are reused
+    _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="infra-heal")
+    
+    @classmethod
+    def shutdown(cls):
+        """Stop the shared worker threads (registered with atexit)."""
+        cls._executor.shutdown(wait=False)
+    
     def __init__(self, project_dir: Path):
         self.project_dir = project_dir
+        # No CLI means no docker steps at all - skip spawning doomed commands
+        self._has_docker = shutil.which("docker") is not None
     
     def heal(self) -> bool:
-        """Validate and fix infrastructure."""
+        """Validate and fix infrastructure; False if any attempted fix failed."""
         
         fixes = []
+        failed = False
         
         # Docker
-        if self._has_docker_compose():
+        if self._has_docker_compose() and self._has_docker:
             if not self._docker_running():
                 print("   🔧 Starting Docker...")
                 if self._start_docker():
                     fixes.append("Docker")
+                else:
+                    failed = True
         
-        # Database migrations
-        if self._has_alembic():
+        # Migrations and MinIO buckets are independent once Docker is up -
+        # overlap them, but report in the usual order
+        pool = self._executor
+        migrations = None
+        # A freshly started stack may have an empty DB: always migrate then
+        if self._has_alembic() and ("Docker" in fixes or self._migrations_pending()):
             print("   🔧 Running migrations...")
-            if self._run_migrations():
-                fixes.append("Migrations")
+            migrations = pool.submit(self._run_migrations)
         
         # MinIO buckets
-        if self._minio_running():
+        buckets = None
+        if self._has_docker and self._minio_running():
             print("   🔧 Creating buckets...")
-            if self._create_buckets():
+            buckets = pool.submit(self._create_buckets)
+        
+        if migrations is not None:
+            if migrations.result():
+                fixes.append("Migrations")
+            else:
+                failed = True
+        
+        if buckets is not None:
+            if buckets.result():
                 fixes.append("Buckets")
+            else:
+                failed = True
         
         if fixes:
             print(f"   ✅ Fixed: {', '.join(fixes)}")
         
-        return True
+        return not failed
     
     def _has_docker_compose(self) -> bool:
         return (self.project_dir / "docker-compose.yml").exists()
     
+    def _compose_ps(self) -> int:
+        """Running container count."""
+        result = subprocess.run(
+            ["docker", "compose", "ps", "-q"],
+            cwd=self.project_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=10
+        )
+        # One ID per line: count newlines on the raw bytes, no decode/split
+        out = result.stdout
+        return out.count(b'\n') + (1 if out and not out.endswith(b'\n') else 0)
+    
     def _docker_running(self) -> bool:
         try:
-            result = subprocess.run(
-                ["docker", "compose", "ps", "-q"],
-                cwd=self.project_dir,
-                capture_output=True,
-                timeout=10
-            )
-            return len(result.stdout.strip()) > 0
+            return self._compose_ps() > 0
         except:
             return False
     
     def _start_docker(self) -> bool:
         try:
-            subprocess.run(
-                ["docker", "compose", "up", "-d"],
+            # --wait blocks until services are running/healthy, replacing a blind sleep
+            result = subprocess.run(
+                ["docker", "compose", "up", "-d", "--wait", "--wait-timeout", "120"],
                 cwd=self.project_dir,
-                capture_output=True,
-                timeout=120,
-                check=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=130
             )
-            time.sleep(10)
-            return True
+            if result.returncode != 0 and b"unknown flag" in result.stderr:
+                # Older compose without --wait: plain up, then poll health
+                subprocess.run(
+                    ["docker", "compose", "up", "-d"],
+                    cwd=self.project_dir,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=120,
+                    check=True
+                )
+                self._wait_healthy()
+                return True
+            return result.returncode == 0
         except:
             return False
     
+    def _wait_healthy(self, timeout: float = 60):
+        """Poll compose health with doubling delays (0.25s .. 4s) until healthy or timeout."""
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while time.monotonic() < deadline:
+            result = subprocess.run(
+                ["docker", "compose", "ps", "--format", "json"],
+                cwd=self.project_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=5
+            )
+            out = result.stdout.strip()
+            try:
+                # A JSON array on older compose, one object per line on newer
+                if out.startswith(b"["):
+                    containers = json.loads(out)
+                else:
+                    containers = [json.loads(line) for line in out.splitlines() if line.strip()]
+            except ValueError:
+                time.sleep(10)  # Unknown format - fall back to the old fixed wait
+                return
+            if all(c.get("Health") in (None, "", "healthy") for c in containers):
+                return
+            time.sleep(delay)
+            delay = min(delay * 2, 4)
+    
     def _has_alembic(self) -> bool:
         return (self.project_dir / "alembic").exists()
     
+    def _alembic_sentinel(self) -> Path:
+        return self.project_dir / ".cursor" / "alembic-applied-head"
+    
+    def _migrations_pending(self) -> bool:
+        """False if no migration file is newer than the last successful upgrade."""
+        try:
+            applied = self._alembic_sentinel().stat().st_mtime
+        except OSError:
+            return True  # Never recorded - let alembic decide
+        versions = (self.project_dir / "alembic" / "versions").glob("*.py")
+        latest = max((p.stat().st_mtime for p in versions), default=0)
+        return latest > applied
+    
     def _run_migrations(self) -> bool:
         try:
             subprocess.run(
                 ["alembic", "upgrade", "head"],
                 cwd=self.project_dir,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=30,
                 check=True
             )
+            sentinel = self._alembic_sentinel()
+            sentinel.parent.mkdir(parents=True, exist_ok=True)
+            sentinel.touch()
             return True
         except:
             return False
     
     def _minio_running(self) -> bool:
-        try:
-            import socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('localhost', 9000))
-            sock.close()
-            return result == 0
-        except:
-            return False
+        return not check_port_available(9000, timeout=0.2)
     
     def _create_buckets(self) -> bool:
         buckets = ['diagrams', 'exports', 'uploads']
-        for bucket in buckets:
-            try:
-                subprocess.run(
-                    ["docker", "exec", "-i", "autograph-minio", "mc", "mb", "-p", f"local/{bucket}"],
-                    capture_output=True,
-                    timeout=5
-                )
-            except:
-                pass
-        return True
+        # mc mb accepts several targets: one container exec instead of one per bucket
+        try:
+            result = subprocess.run(
+                ["docker", "exec", "-i", "autograph-minio", "mc", "mb", "-p"]
+                + [f"local/{bucket}" for bucket in buckets],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=10
+            )
+            return result.returncode == 0 or b"already" in result.stderr
+        except:
+            return False
+
+
+def prewarm(project_dir: Path) -> bool:
+    """
+    Heal once ahead of the first real run (e.g. during a CI image build).
+
+    Leaves the compose stack up and the alembic sentinel written, so the
+    next heal() skips the startup and migration steps.
+    """
+    return InfrastructureHealer(Path(project_dir).resolve()).heal()
+
 
+atexit.register(InfrastructureHealer.shutdown)
@@ -9,14 +9,47 @@ Cross-session learning and adaptation:
 - Session profiling
 """
 
-from .pattern_db import PatternDatabase, ErrorPattern
-from .adaptive_prompter import AdaptivePrompter
-from .dependency_graph import DependencyGraph, TaskNode
-from .canary_session import CanarySession, CanaryResult
-from .telemetry_loop import TelemetryLoop, TelemetryEvent, ActionTrigger
-from .auto_recovery import AutoRecovery, RecoveryStrategy, RecoveryAction
-from .performance_profiler import PerformanceProfiler, SessionProfile, ProfileMetric
-from .session_analytics import SessionAnalytics, AnalyticsSummary
-from .multi_agent import MultiAgentCoordinator, AgentTask, AgentMessage, AgentStatus
+import importlib
+
+# Public name -> submodule. Submodules are imported on first attribute access
+# (PEP 562), so e.g. the adaptive prompter does not pull in the whole layer.
+_EXPORTS = {
+    'PatternDatabase': 'pattern_db',
+    'ErrorPattern': 'pattern_db',
+    'AdaptivePrompter': 'adaptive_prompter',
+    'DependencyGraph': 'dependency_graph',
+    'TaskNode': 'dependency_graph',
+    'CanarySession': 'canary_session',
+    'CanaryResult': 'canary_session',
+    'TelemetryLoop': 'telemetry_loop',
+    'TelemetryEvent': 'telemetry_loop',
+    'ActionTrigger': 'telemetry_loop',
+    'AutoRecovery': 'auto_recovery',
+    'RecoveryStrategy': 'auto_recovery',
+    'RecoveryAction': 'auto_recovery',
+    'PerformanceProfiler': 'performance_profiler',
+    'SessionProfile': 'performance_profiler',
+    'ProfileMetric': 'performance_profiler',
+    'SessionAnalytics': 'session_analytics',
+    'AnalyticsSummary': 'session_analytics',
+    'MultiAgentCoordinator': 'multi_agent',
+    'AgentTask': 'multi_agent',
+    'AgentMessage': 'multi_agent',
+    'AgentStatus': 'multi_agent',
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = ['PatternDatabase', 'ErrorPattern', 'AdaptivePrompter', 'DependencyGraph', 'TaskNode', 'CanarySession', 'CanaryResult', 'TelemetryLoop', 'TelemetryEvent', 'ActionTrigger', 'AutoRecovery', 'RecoveryStrategy', 'RecoveryAction', 'PerformanceProfiler', 'SessionProfile', 'ProfileMetric', 'SessionAnalytics', 'AnalyticsSummary', 'MultiAgentCoordinator', 'AgentTask', 'AgentMessage', 'AgentStatus']
@@ -5,12 +5,42 @@ Uses pattern database to augment prompts with relevant failure patterns
 and successful resolutions from previous sessions.
 """
 
+import re
 from pathlib import Path
 from typing import Optional, List
 
 from .pattern_db import PatternDatabase, ErrorPattern
 
 
+# Insertion points in priority order (first one present wins, wherever it is)
+_MARKERS = (
+    "\n## Your Task",
+    "\n## Project Specification",
+    "\n## Current Work Item",
+    "\n---\n\n##",
+)
+# One scan finds every marker; the lookahead keeps overlapping ones visible
+# (e.g. "\n---\n\n## Your Task" holds two markers)
+_MARKER_RE = re.compile(
+    "\n(?=(" + "|".join(re.escape(m[1:]) for m in _MARKERS) + "))"
+)
+
+# Static parts of the pattern injection, built once
+_INJECTION_HEADER = (
+    "---",
+    "",
+    "## 🧠 Learned Patterns (Intelligence Layer)",
+    "",
+    "The following patterns were learned from previous sessions on this project.",
+    "Please review and apply these learnings to avoid repeating mistakes:",
+    "",
+)
+_INJECTION_FOOTER = (
+    "Apply these learnings proactively to avoid known issues.",
+    "",
+)
+
+
 class AdaptivePrompter:
     """
     Manages adaptive prompting based on learned patterns.
@@ -41,6 +71,9 @@ class AdaptivePrompter:
         self.min_relevance = min_relevance
         
         self.pattern_db = PatternDatabase(project_dir) if enabled else None
+        
+        # Rendered per-pattern blocks, keyed by everything the text depends on
+        self._inject_cache: dict = {}
     
     def augment_prompt(
         self,
@@ -74,53 +107,60 @@ class AdaptivePrompter:
         injection = self._build_pattern_injection(patterns)
         
         # Insert after system instructions but before task details
-        # Look for common markers
-        markers = [
-            "\n## Your Task",
-            "\n## Project Specification",
-            "\n## Current Work Item",
-            "\n---\n\n##"
-        ]
-        
-        for marker in markers:
-            if marker in base_prompt:
-                parts = base_prompt.split(marker, 1)
-                return f"{parts[0]}\n\n{injection}\n\n{marker}{parts[1]}"
+        # Look for common markers (first occurrence of each, single pass)
+        found = {}
+        for match in _MARKER_RE.finditer(base_prompt):
+            found.setdefault("\n" + match.group(1), match.start())
+        
+        for marker in _MARKERS:
+            if marker in found:
+                at = found[marker]
+                return f"{base_prompt[:at]}\n\n{injection}\n\n{base_prompt[at:]}"
         
         # Fallback: append at end
         return f"{base_prompt}\n\n{injection}"
     
     def _build_pattern_injection(self, patterns: List[ErrorPattern]) -> str:
         """Build the injection text from patterns."""
-        lines = [
-            "---",
-            "",
-            "## 🧠 Learned Patterns (Intelligence Layer)",
-            "",
-            "The following patterns were learned from previous sessions on this project.",
-            "Please review and apply these learnings to avoid repeating mistakes:",
-            ""
-        ]
-        
+        lines = list(_INJECTION_HEADER)
         for i, pattern in enumerate(patterns, 1):
-            lines.append(f"### Pattern {i}: {pattern.error_type}")
-            lines.append("")
-            lines.append(pattern.to_prompt_text())
-            
-            # Show success rate if pattern has been resolved
-            if pattern.resolution_count > 0:
-                success_pct = pattern.success_rate * 100
-                lines.append(f"**Success rate:** {success_pct:.0f}% ({pattern.resolution_count}/{pattern.occurrence_count} resolutions)")
-                lines.append("")
-            
-            lines.append("---")
-            lines.append("")
-        
-        lines.append("Apply these learnings proactively to avoid known issues.")
-        lines.append("")
+            lines += (f"### Pattern {i}: {pattern.error_type}", "", self._pattern_block(pattern))
+        lines += _INJECTION_FOOTER
         
         return '\n'.join(lines)
     
+    def _pattern_block(self, pattern: ErrorPattern) -> str:
+        """Body of one pattern's injection, memoized until the pattern changes."""
+        key = (
+            pattern.pattern_id,
+            pattern.occurrence_count,
+            pattern.resolution_count,
+            len(pattern.successful_fixes),
+            len(pattern.failed_fixes),
+            len(pattern.file_patterns),
+        )
+        block = self._inject_cache.get(key)
+        if block is not None:
+            return block
+        
+        block_lines = [pattern.to_prompt_text()]
+        
+        # Show success rate if pattern has been resolved
+        if pattern.resolution_count > 0:
+            success_pct = pattern.success_rate * 100
+            block_lines.append(f"**Success rate:** {success_pct:.0f}% ({pattern.resolution_count}/{pattern.occurrence_count} resolutions)")
+            block_lines.append("")
+        
+        block_lines.append("---")
+        block_lines.append("")
+        block = '\n'.join(block_lines)
+        
+        # FIFO bound: stale versions of a pattern age out
+        if len(self._inject_cache) >= self.max_patterns * 16:
+            del self._inject_cache[next(iter(self._inject_cache))]
+        self._inject_cache[key] = block
+        return block
+    
     def record_error(
         self,
         error_type: str,
@@ -0,0 +1,108 @@
+"""
+Background file writer for intelligence state.
+
+Callers serialize on their own thread (so the payload is a consistent
+snapshot) and hand the bytes over; large payloads are written by a single
+daemon thread so recording calls don't wait on disk I/O. Queued writes to
+the same path coalesce - only the latest payload is written.
+"""
+
+import atexit
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Payloads smaller than this are written inline: for small files the
+# thread handoff costs more than the write itself
+ASYNC_MIN_BYTES = 64 * 1024
+
+
+def _write_file(path: Path, payload: bytes):
+    """Write payload to path atomically (temp file, then rename over it)."""
+    # Never truncate the live file: a crash mid-write would leave it empty
+    # or partial, and the next load would silently drop everything
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+
+
+class AsyncWriter:
+    """
+    Writes files on a background thread.
+
+    Writes to a path are applied in submission order: a small payload
+    for a path that still has a queued or in-flight write is queued too,
+    so an older payload can never land last.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Path, bytes] = {}  # Insertion-ordered queue
+        self._inflight: Optional[Path] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, path: Path, payload: bytes):
+        """
+        Write payload to path - queued if large, otherwise inline.
+
+        Inline writes raise on failure; queued writes report failures
+        from the writer thread.
+
+        Args:
+            path: Destination file
+            payload: Complete file contents
+        """
+        path = Path(path)
+        with self._cond:
+            if (len(payload) >= ASYNC_MIN_BYTES or path in self._pending
+                    or path == self._inflight):
+                self._pending[path] = payload  # Replaces any older queued payload
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="intelligence-writer", daemon=True
+                    )
+                    self._thread.start()
+                self._cond.notify_all()
+                return
+            _write_file(path, payload)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued write has been applied.
+
+        Args:
+            timeout: Max seconds to wait (None = no limit)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and self._inflight is None, timeout
+            )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                path = next(iter(self._pending))
+                payload = self._pending.pop(path)
+                self._inflight = path
+            try:
+                _write_file(path, payload)
+            except Exception as e:
+                print(f"   ⚠️  Failed to write {path.name}: {e}")
+            finally:
+                with self._cond:
+                    self._inflight = None
+                    self._cond.notify_all()
+
+
+# Shared by all intelligence modules
+writer = AsyncWriter()
+
+# The thread is a daemon; make sure queued writes land before exit
+atexit.register(writer.flush)
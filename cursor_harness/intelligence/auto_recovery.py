@@ -4,13 +4,23 @@ Auto-recovery strategies for common failure scenarios.
 Detects failure patterns and applies recovery strategies automatically.
 """
 
-import json
+import os
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
+from collections import Counter
+
+from .serialization import dumps, loads
+
+
+# Exponential backoff in seconds by retry count, capped at 60s
+_BACKOFF_TABLE = (1, 2, 4, 8, 16, 32, 60)
+
+# Recent actions kept in memory; older ones stay in the on-disk log only
+_MAX_ACTIONS = 1000
 
 
 class RecoveryStrategy(Enum):
@@ -36,14 +46,65 @@ class RecoveryAction:
     success: Optional[bool] = None
     notes: str = ""
     
+    def __post_init__(self):
+        self._cached_dict = None  # Not a field: invisible to asdict/eq/repr
+    
+    def finalize(self, success: bool, notes: str):
+        """Set the outcome; use this rather than assigning fields so to_dict stays fresh."""
+        self.success = success
+        self.notes = notes
+        self._cached_dict = None
+    
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Actions are append-only once finalized, so serialize them once
+        if self._cached_dict is None:
+            self._cached_dict = asdict(self)
+        return self._cached_dict
     
     @staticmethod
     def from_dict(data: Dict) -> 'RecoveryAction':
         return RecoveryAction(**data)
 
 
+# Escalating strategy selectors: (consecutive_failures, retry_count, context) -> strategy
+
+def _sel_verification(consecutive: int, retry_count: int, context: Dict) -> RecoveryStrategy:
+    if consecutive >= 3:
+        return RecoveryStrategy.CHECKPOINT_ROLLBACK
+    elif consecutive >= 2:
+        return RecoveryStrategy.SIMPLIFY_TASK
+    return RecoveryStrategy.RETRY_WITH_BACKOFF
+
+
+def _sel_timeout(consecutive: int, retry_count: int, context: Dict) -> RecoveryStrategy:
+    if retry_count >= 2:
+        return RecoveryStrategy.REDUCE_SCOPE
+    return RecoveryStrategy.RETRY_WITH_BACKOFF
+
+
+def _sel_model_error(consecutive: int, retry_count: int, context: Dict) -> RecoveryStrategy:
+    if retry_count >= 1:
+        return RecoveryStrategy.FALLBACK_MODEL
+    return RecoveryStrategy.RETRY_WITH_BACKOFF
+
+
+def _sel_dependency(consecutive: int, retry_count: int, context: Dict) -> RecoveryStrategy:
+    if context.get('critical', False):
+        return RecoveryStrategy.CHECKPOINT_ROLLBACK
+    return RecoveryStrategy.SKIP_AND_CONTINUE
+
+
+_SELECTORS: Dict[str, Callable[[int, int, Dict], RecoveryStrategy]] = {
+    'verification_failure': _sel_verification,
+    'timeout': _sel_timeout,
+    'loop_detected': lambda consecutive, retry_count, context: RecoveryStrategy.BREAK_INTO_SUBTASKS,
+    'context_overflow': lambda consecutive, retry_count, context: RecoveryStrategy.REDUCE_CONTEXT,
+    'model_error': _sel_model_error,
+    'dependency_failure': _sel_dependency,
+    'resource_exhaustion': lambda consecutive, retry_count, context: RecoveryStrategy.REDUCE_SCOPE,
+}
+
+
 class AutoRecovery:
     """
     Automatic recovery system for handling failures.
@@ -63,10 +124,20 @@ class AutoRecovery:
         self.recovery_dir = self.project_dir / ".cursor" / "recovery"
         self.recovery_dir.mkdir(parents=True, exist_ok=True)
         
-        self.actions_file = self.recovery_dir / "actions.json"
+        # Append-only JSONL log: one RecoveryAction per line
+        self.actions_file = self.recovery_dir / "actions.jsonl"
+        self._legacy_actions_file = self.recovery_dir / "actions.json"
+        self._actions_fh = None  # Append handle, kept open across recoveries
         self.state_file = self.recovery_dir / "state.json"
+        self._state_fh = None  # Opened on first save, then rewritten in place
+        
+        self.actions: List[RecoveryAction] = []  # The most recent _MAX_ACTIONS
+        # get_stats aggregates over the whole log, kept in step by _add_action
+        self._total_actions = 0
+        self._successful_actions = 0
+        self._by_strategy: Counter = Counter()
+        self._by_failure: Counter = Counter()
         
-        self.actions: List[RecoveryAction] = []
         self.state: Dict[str, Any] = {
             'consecutive_failures': 0,
             'last_success_time': None,
@@ -117,14 +188,12 @@ class AutoRecovery:
         if strategy.value in self.strategy_handlers:
             try:
                 result = self.strategy_handlers[strategy.value](context)
-                action.success = result.get('success', False)
-                action.notes = result.get('notes', '')
+                action.finalize(result.get('success', False), result.get('notes', ''))
             except Exception as e:
-                action.success = False
-                action.notes = f"Strategy execution failed: {str(e)}"
+                action.finalize(False, f"Strategy execution failed: {str(e)}")
         
-        self.actions.append(action)
-        self._save_actions()
+        self._add_action(action)
+        self._append_action(action)
         
         # Update state
         if action.success:
@@ -154,46 +223,11 @@ class AutoRecovery:
         Returns:
             RecoveryStrategy or None
         """
-        consecutive = self.state['consecutive_failures']
-        retry_count = self.state['retry_count']
-        
-        # Escalating recovery strategies
-        if failure_type == "verification_failure":
-            if consecutive >= 3:
-                return RecoveryStrategy.CHECKPOINT_ROLLBACK
-            elif consecutive >= 2:
-                return RecoveryStrategy.SIMPLIFY_TASK
-            else:
-                return RecoveryStrategy.RETRY_WITH_BACKOFF
-        
-        elif failure_type == "timeout":
-            if retry_count >= 2:
-                return RecoveryStrategy.REDUCE_SCOPE
-            else:
-                return RecoveryStrategy.RETRY_WITH_BACKOFF
-        
-        elif failure_type == "loop_detected":
-            return RecoveryStrategy.BREAK_INTO_SUBTASKS
-        
-        elif failure_type == "context_overflow":
-            return RecoveryStrategy.REDUCE_CONTEXT
-        
-        elif failure_type == "model_error":
-            if retry_count >= 1:
-                return RecoveryStrategy.FALLBACK_MODEL
-            else:
-                return RecoveryStrategy.RETRY_WITH_BACKOFF
-        
-        elif failure_type == "dependency_failure":
-            if context.get('critical', False):
-                return RecoveryStrategy.CHECKPOINT_ROLLBACK
-            else:
-                return RecoveryStrategy.SKIP_AND_CONTINUE
-        
-        elif failure_type == "resource_exhaustion":
-            return RecoveryStrategy.REDUCE_SCOPE
-        
-        return None
+        selector = _SELECTORS.get(failure_type)
+        if selector is None:
+            return None
+        state = self.state
+        return selector(state['consecutive_failures'], state['retry_count'], context)
     
     def register_strategy_handler(
         self,
@@ -232,7 +266,7 @@ class AutoRecovery:
         
         def retry_with_backoff(context):
             retry_count = self.state['retry_count']
-            backoff = min(2 ** retry_count, 60)  # Exponential backoff, max 60s
+            backoff = _BACKOFF_TABLE[min(retry_count, len(_BACKOFF_TABLE) - 1)]
             print(f"\n   🔁 RECOVERY: Retry with backoff")
             print(f"      Retry #{retry_count + 1}, backoff: {backoff}s")
             time.sleep(backoff)
@@ -276,24 +310,15 @@ class AutoRecovery:
     
     def get_stats(self) -> Dict:
         """Get recovery statistics."""
-        total = len(self.actions)
-        successful = sum(1 for a in self.actions if a.success)
-        
-        by_strategy = {}
-        for action in self.actions:
-            by_strategy[action.strategy] = by_strategy.get(action.strategy, 0) + 1
-        
-        by_failure = {}
-        for action in self.actions:
-            by_failure[action.failure_type] = by_failure.get(action.failure_type, 0) + 1
-        
+        total = self._total_actions
+        successful = self._successful_actions
         return {
             'total_recoveries': total,
             'successful': successful,
             'failed': total - successful,
             'success_rate': successful / total if total > 0 else 0.0,
-            'by_strategy': by_strategy,
-            'by_failure_type': by_failure,
+            'by_strategy': dict(self._by_strategy),
+            'by_failure_type': dict(self._by_failure),
             'current_state': self.state.copy()
         }
     
@@ -302,44 +327,124 @@ class AutoRecovery:
         return self.actions[-limit:]
     
     def _load_actions(self):
-        """Load actions from disk."""
+        """Load actions from disk (migrating a legacy actions.json once)."""
         if not self.actions_file.exists():
+            if self._legacy_actions_file.exists():
+                try:
+                    with open(self._legacy_actions_file, 'rb') as f:
+                        legacy = [RecoveryAction.from_dict(a) for a in loads(f.read())]
+                    for action in legacy:
+                        self._add_action(action)
+                    self._write_actions_log(dumps(a.to_dict()) + b'\n' for a in legacy)
+                except:
+                    pass
             return
         
+        torn = False
+        try:
+            with open(self.actions_file, 'rb') as f:
+                # Every line feeds the aggregates; only the tail stays in memory
+                for line in f:
+                    try:
+                        self._add_action(RecoveryAction.from_dict(loads(line)))
+                    except (ValueError, TypeError):
+                        torn = True  # Torn/partial line from an interrupted append
+                    if not line.endswith(b'\n'):
+                        torn = True  # The next append would run into it
+        except:
+            pass
+        if torn:
+            self._compact_actions()
+    
+    def _add_action(self, action: RecoveryAction):
+        """Record an action in memory (recent list + whole-log aggregates)."""
+        actions = self.actions
+        actions.append(action)
+        if len(actions) > _MAX_ACTIONS:
+            del actions[0]
+        self._total_actions += 1
+        if action.success:
+            self._successful_actions += 1
+        self._by_strategy[action.strategy] += 1
+        self._by_failure[action.failure_type] += 1
+    
+    def _append_action(self, action: RecoveryAction):
+        """Append one action to the log - O(1) bytes per call instead of a full rewrite."""
         try:
-            with open(self.actions_file, 'r') as f:
-                data = json.load(f)
-                self.actions = [RecoveryAction.from_dict(a) for a in data]
+            if self._actions_fh is None:
+                self._actions_fh = open(self.actions_file, 'ab')
+            self._actions_fh.write(dumps(action.to_dict()) + b'\n')
+            self._actions_fh.flush()
         except:
             pass
     
-    def _save_actions(self):
-        """Save actions to disk."""
+    def _compact_actions(self):
+        """Rewrite the actions log without its torn lines (every valid line is kept)."""
         try:
-            with open(self.actions_file, 'w') as f:
-                json.dump(
-                    [a.to_dict() for a in self.actions],
-                    f,
-                    indent=2
+            with open(self.actions_file, 'rb') as f:
+                self._write_actions_log(
+                    line if line.endswith(b'\n') else line + b'\n'
+                    for line in f if self._is_valid_line(line)
                 )
         except:
             pass
     
+    @staticmethod
+    def _is_valid_line(line: bytes) -> bool:
+        try:
+            RecoveryAction.from_dict(loads(line))
+            return True
+        except (ValueError, TypeError):
+            return False
+    
+    def _write_actions_log(self, lines):
+        """Replace the actions log with lines, atomically."""
+        self._close_handle('_actions_fh')  # It would point at the replaced inode
+        try:
+            tmp = self.actions_file.with_suffix('.jsonl.tmp')
+            with open(tmp, 'wb') as f:
+                f.writelines(lines)
+            os.replace(tmp, self.actions_file)
+        except:
+            pass
+    
     def _load_state(self):
         """Load state from disk."""
         if not self.state_file.exists():
             return
         
         try:
-            with open(self.state_file, 'r') as f:
-                self.state.update(json.load(f))
+            with open(self.state_file, 'rb') as f:
+                self.state.update(loads(f.read()))
         except:
             pass
     
     def _save_state(self):
-        """Save state to disk."""
+        """Save state to disk (one open handle, rewritten in place)."""
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            if self._state_fh is None:
+                self._state_fh = open(self.state_file, 'wb')
+            fh = self._state_fh
+            fh.seek(0)
+            fh.truncate()
+            fh.write(dumps(self.state, indent=True))
+            fh.flush()
         except:
             pass
+    
+    def _close_handle(self, attr: str):
+        fh = getattr(self, attr, None)  # May be unset if __init__ failed
+        if fh is not None:
+            try:
+                fh.close()
+            except:
+                pass
+            setattr(self, attr, None)
+    
+    def close(self):
+        """Release the actions log and state file handles."""
+        self._close_handle('_actions_fh')
+        self._close_handle('_state_fh')
+    
+    def __del__(self):
+        self.close()
@@ -5,14 +5,92 @@ Runs experimental changes in isolated sessions before applying to main flow.
 Compares outputs, detects regressions, auto-validates changes.
 """
 
-import json
 import hashlib
+import os
+import re
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
-import difflib
+
+from .serialization import dumps, loads
+
+try:
+    from rapidfuzz.distance import Indel  # Optional: C implementation of _lcs_similarity
+except ImportError:
+    Indel = None
+
+# Error markers, found in one pass per output
+_ERROR_MARKERS = re.compile(r'ERROR|FAIL')
+
+# Results kept in memory and in results.json; older ones are paged out to
+# the append-only results archive
+_MAX_RESULTS = 1000
+
+
+def _fast_rmtree(path: str):
+    """Iterative scandir-driven rmtree: one stack, no per-directory frames."""
+    stack = [(path, False)]
+    while stack:
+        p, post = stack.pop()
+        if post:
+            os.rmdir(p)
+            continue
+        stack.append((p, True))
+        with os.scandir(p) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, False))
+                else:
+                    os.unlink(entry.path)
+
+
+def _lcs_length(a: str, b: str) -> int:
+    """Longest common subsequence length (bit-parallel, one big-int row per char of a)."""
+    if len(a) < len(b):
+        a, b = b, a
+    masks: Dict[str, int] = {}
+    bit = 1
+    for ch in b:
+        masks[ch] = masks.get(ch, 0) | bit
+        bit <<= 1
+    full = bit - 1
+    v = full
+    for ch in a:
+        m = masks.get(ch)
+        if m is not None:
+            u = v & m
+            v = ((v + u) | (v - u)) & full
+    return len(b) - bin(v).count('1')
+
+
+def _lcs_similarity(a: str, b: str) -> float:
+    """
+    2 * LCS / (len(a) + len(b)): 1.0 = identical, 0.0 = nothing in common.
+    
+    Same value as rapidfuzz's Indel.normalized_similarity, which is used
+    instead when installed.
+    """
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if Indel is not None:
+        return Indel.normalized_similarity(a, b)
+    # Common prefix/suffix are part of every LCS; only diff the middle
+    n = min(len(a), len(b))
+    start = 0
+    while start < n and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < n - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    common = start + end
+    if common:
+        a, b = a[start:len(a) - end], b[start:len(b) - end]
+    return 2 * (common + _lcs_length(a, b)) / total
 
 
 @dataclass
@@ -29,8 +107,14 @@ class CanaryResult:
     regression_detected: bool
     notes: str = ""
     
+    def __post_init__(self):
+        self._cached_dict = None  # Not a field: invisible to asdict/eq/repr
+    
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Results are immutable once recorded; every save re-serializes them all
+        if self._cached_dict is None:
+            self._cached_dict = asdict(self)
+        return self._cached_dict
     
     @staticmethod
     def from_dict(data: Dict) -> 'CanaryResult':
@@ -60,7 +144,10 @@ class CanarySession:
         self.canary_dir.mkdir(parents=True, exist_ok=True)
         
         self.results_file = self.canary_dir / "results.json"
-        self.results: List[CanaryResult] = []
+        self.archive_file = self.canary_dir / "results_archive.jsonl"
+        self.results: List[CanaryResult] = []  # The most recent _MAX_RESULTS
+        # (total, passed, regressions, diff_sum) over the archive; read lazily
+        self._archive_totals: Optional[Tuple[int, int, int, float]] = None
         self._load_results()
     
     def run_canary_test(
@@ -89,22 +176,20 @@ class CanarySession:
         canary_dir = self.canary_dir / f"{canary_id}_canary"
         
         try:
-            # Clone to control workspace
-            self._checkout_to_workspace(control_branch, control_dir)
-            
-            # Clone to canary workspace
-            self._checkout_to_workspace(canary_branch, canary_dir)
-            
-            # Run task in control
-            import time
-            control_start = time.time()
-            control_output = self._run_task(control_dir, task_description, timeout_seconds)
-            control_duration = time.time() - control_start
-            
-            # Run task in canary
-            canary_start = time.time()
-            canary_output = self._run_task(canary_dir, task_description, timeout_seconds)
-            canary_duration = time.time() - canary_start
+            # Workspaces are isolated: check out and run both sides concurrently
+            # (the work is git/subprocess-bound, so threads overlap fine)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                checkouts = [
+                    pool.submit(self._checkout_to_workspace, control_branch, control_dir),
+                    pool.submit(self._checkout_to_workspace, canary_branch, canary_dir),
+                ]
+                for future in checkouts:
+                    future.result()  # Re-raise checkout failures
+                
+                control_run = pool.submit(self._timed_run, control_dir, task_description, timeout_seconds)
+                canary_run = pool.submit(self._timed_run, canary_dir, task_description, timeout_seconds)
+                control_output, control_duration = control_run.result()
+                canary_output, canary_duration = canary_run.result()
             
             # Compare outputs
             diff_score = self._calculate_diff_score(control_output, canary_output)
@@ -143,17 +228,22 @@ class CanarySession:
     
     def _generate_canary_id(self, task: str, control: str, canary: str) -> str:
         """Generate unique canary ID."""
-        content = f"{task}_{control}_{canary}_{datetime.utcnow().isoformat()}"
-        return hashlib.md5(content.encode()).hexdigest()[:12]
+        h = hashlib.blake2b(digest_size=6)  # 12 hex chars, no truncation step
+        for part in (task, control, canary, datetime.utcnow().isoformat()):
+            h.update(part.encode())
+            h.update(b'_')
+        return h.hexdigest()
     
     def _checkout_to_workspace(self, git_ref: str, workspace: Path):
         """Checkout git ref to isolated workspace."""
         workspace.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Use git worktree for lightweight checkout
+            # Use git worktree for lightweight checkout. --detach: a branch that is
+            # already checked out (e.g. "main" in the project itself) would
+            # otherwise be refused and force the full clone fallback below
             subprocess.run(
-                ['git', 'worktree', 'add', str(workspace), git_ref],
+                ['git', 'worktree', 'add', '--detach', str(workspace), git_ref],
                 cwd=self.project_dir,
                 check=True,
                 capture_output=True
@@ -172,6 +262,12 @@ class CanarySession:
                 capture_output=True
             )
     
+    def _timed_run(self, workspace: Path, task: str, timeout: int):
+        """Run task and return (output, duration in seconds)."""
+        start = time.perf_counter()
+        output = self._run_task(workspace, task, timeout)
+        return output, time.perf_counter() - start
+    
     def _run_task(self, workspace: Path, task: str, timeout: int) -> str:
         """
         Execute task in workspace and capture output.
@@ -209,9 +305,9 @@ class CanarySession:
         if control == canary:
             return 0.0
         
-        # Use difflib sequence matcher
-        matcher = difflib.SequenceMatcher(None, control, canary)
-        similarity = matcher.ratio()  # 0.0 to 1.0, higher = more similar
+        # One metric for every input size: the LCS ratio that difflib's
+        # SequenceMatcher.ratio() approximates, computed exactly
+        similarity = _lcs_similarity(control, canary)
         
         return 1.0 - similarity  # Invert to get difference score
     
@@ -232,8 +328,8 @@ class CanarySession:
         - High diff score on critical outputs
         """
         # Check for new errors
-        control_has_error = 'ERROR' in control_output or 'FAIL' in control_output
-        canary_has_error = 'ERROR' in canary_output or 'FAIL' in canary_output
+        control_has_error = _ERROR_MARKERS.search(control_output) is not None
+        canary_has_error = _ERROR_MARKERS.search(canary_output) is not None
         
         if canary_has_error and not control_has_error:
             return True
@@ -263,12 +359,12 @@ class CanarySession:
         except:
             pass
         
-        # Fallback: manual cleanup
-        import shutil
-        try:
-            shutil.rmtree(workspace)
-        except:
-            pass
+        # Fallback: manual cleanup (clone fallback, or worktree remove failed)
+        if workspace.exists():
+            try:
+                _fast_rmtree(str(workspace))
+            except:
+                pass
     
     def get_recent_results(self, limit: int = 10) -> List[CanaryResult]:
         """Get recent canary test results."""
@@ -276,19 +372,20 @@ class CanarySession:
     
     def get_pass_rate(self) -> float:
         """Calculate overall canary pass rate."""
-        if not self.results:
-            return 0.0
-        
-        passed = sum(1 for r in self.results if r.passed)
-        return passed / len(self.results)
+        return self.get_stats()['pass_rate']
     
     def get_stats(self) -> Dict:
         """Get canary testing statistics."""
-        total = len(self.results)
-        passed = sum(1 for r in self.results if r.passed)
-        regressions = sum(1 for r in self.results if r.regression_detected)
+        total, passed, regressions, diff_sum = self._get_archive_totals()
+        total += len(self.results)
+        for r in self.results:  # One pass for all aggregates
+            if r.passed:
+                passed += 1
+            if r.regression_detected:
+                regressions += 1
+            diff_sum += r.diff_score
         
-        avg_diff = sum(r.diff_score for r in self.results) / total if total > 0 else 0.0
+        avg_diff = diff_sum / total if total > 0 else 0.0
         
         return {
             'total_tests': total,
@@ -305,20 +402,59 @@ class CanarySession:
             return
         
         try:
-            with open(self.results_file, 'r') as f:
-                data = json.load(f)
-                self.results = [CanaryResult.from_dict(r) for r in data]
+            with open(self.results_file, 'rb') as f:
+                data = loads(f.read())
+            self.results = [CanaryResult.from_dict(r) for r in data]
         except:
-            pass
+            return
+        if len(self.results) > _MAX_RESULTS:
+            self._save_results()  # Written before paging: page out the excess now
     
     def _save_results(self):
-        """Save results to disk."""
+        """Save results to disk, paging results beyond the window out to the archive."""
+        excess = len(self.results) - _MAX_RESULTS
+        if excess > 0:
+            self._page_out(self.results[:excess])
+            del self.results[:excess]
         try:
-            with open(self.results_file, 'w') as f:
-                json.dump(
-                    [r.to_dict() for r in self.results],
-                    f,
-                    indent=2
-                )
+            # Compact (no indent): results embed full task outputs
+            self.results_file.write_bytes(dumps([r.to_dict() for r in self.results]))
         except:
             pass
+    
+    def _page_out(self, results: List[CanaryResult]):
+        """Append results to the archive and fold them into its totals."""
+        totals = self._get_archive_totals()
+        try:
+            with open(self.archive_file, 'ab') as f:
+                f.write(b''.join(dumps(r.to_dict()) + b'\n' for r in results))
+        except:
+            pass
+        total, passed, regressions, diff_sum = totals
+        for r in results:
+            passed += r.passed
+            regressions += r.regression_detected
+            diff_sum += r.diff_score
+        self._archive_totals = (total + len(results), passed, regressions, diff_sum)
+    
+    def _get_archive_totals(self) -> Tuple[int, int, int, float]:
+        """Aggregates over the archive, scanned once on first use."""
+        if self._archive_totals is None:
+            total = passed = regressions = 0
+            diff_sum = 0.0
+            if self.archive_file.exists():
+                try:
+                    with open(self.archive_file, 'rb') as f:
+                        for line in f:
+                            try:
+                                r = loads(line)
+                            except ValueError:
+                                continue  # Torn line from an interrupted append
+                            total += 1
+                            passed += bool(r.get('passed'))
+                            regressions += bool(r.get('regression_detected'))
+                            diff_sum += r.get('diff_score', 0.0)
+                except:
+                    pass
+            self._archive_totals = (total, passed, regressions, diff_sum)
+        return self._archive_totals
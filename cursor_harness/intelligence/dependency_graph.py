@@ -5,12 +5,35 @@ Builds and maintains a dependency graph so tasks execute in
 correct order and blockers are identified proactively.
 """
 
-import json
+import os
 import re
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple
-from dataclasses import dataclass, field, asdict
-from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from collections import deque
+
+from .serialization import dumps, loads, pack, read_packed
+
+
+# Dependency phrases ("depends on X", "after X", "requires X", "blocked by X",
+# "needs X to be") as one lookahead alternation, so a single scan of the text
+# still reports phrases that overlap (e.g. "requires after login"). Phrase k
+# is group 2k+1 (the whole phrase) around group 2k+2 (the task ID)
+_DEP_RE = re.compile(
+    r'(?=(depends?\s+on\s+([a-z0-9_-]+))'
+    r'|(after\s+([a-z0-9_-]+))'
+    r'|(requires?\s+([a-z0-9_-]+))'
+    r'|(blocked\s+by\s+([a-z0-9_-]+))'
+    r'|(needs\s+([a-z0-9_-]+)\s+to\s+be))'
+)
+_DEP_PHRASES = 5
+
+
+# Kahn index slot states
+_SLOT_UNKNOWN = 0  # Referenced as a dependency, no such task yet
+_SLOT_PENDING = 1
+_SLOT_DONE = 2
 
 
 @dataclass
@@ -24,10 +47,15 @@ class TaskNode:
     completed: bool = False
     
     def to_dict(self) -> Dict:
-        d = asdict(self)
-        d['dependencies'] = list(self.dependencies)
-        d['blocked_by'] = list(self.blocked_by)
-        return d
+        # Hand-built: asdict deep-copies every field recursively
+        return {
+            'task_id': self.task_id,
+            'title': self.title,
+            'description': self.description,
+            'dependencies': list(self.dependencies),
+            'blocked_by': list(self.blocked_by),
+            'completed': self.completed,
+        }
     
     @staticmethod
     def from_dict(data: Dict) -> 'TaskNode':
@@ -58,7 +86,50 @@ class DependencyGraph:
         self.graph_file = self.graph_dir / "graph.json"
         
         self.tasks: Dict[str, TaskNode] = {}
+        self._batch_depth = 0  # > 0 inside batch(): saves are deferred
+        self._dirty = False
+        
+        # Kahn indices, maintained by every mutation. Every task ID (and any
+        # dependency ID referenced before its task exists) gets a stable
+        # integer slot, so the sort runs on plain lists instead of dicts:
+        # dependents per slot, count of existing incomplete dependencies,
+        # and slot state (_SLOT_UNKNOWN / _SLOT_PENDING / _SLOT_DONE)
+        self._idx: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._adj: List[List[int]] = []
+        self._in_degree: List[int] = []
+        self._state = bytearray()
+        # Position of each slot's task in self.tasks (-1 until the task exists)
+        self._rank: List[int] = []
+        # Incomplete tasks split by whether anything blocks them (dicts used
+        # as sets; the getters list them in task order), reclassified as
+        # tasks change
+        self._ready: Dict[str, None] = {}
+        self._blocked: Dict[str, None] = {}
+        
+        self._version = 0  # Bumped by every mutation; keys derived-output caches
+        self._mermaid_cache: Optional[Tuple[int, str]] = None
+        # infer_dependencies_from_description results for _infer_version only
+        self._infer_cache: Dict[str, List[str]] = {}
+        self._infer_version = 0
         self._load()
+        self._rebuild_indices()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Defer saving until the outermost batch exits.
+        
+        Use for bulk loads: ``with graph.batch(): ...add_task(...)``
+        writes graph.json once instead of once per mutation.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._save()
     
     def add_task(
         self,
@@ -87,10 +158,37 @@ class DependencyGraph:
             completed=False
         )
         
-        # Update blocked_by for dependencies
-        task.blocked_by = {dep for dep in task.dependencies if not self.tasks.get(dep, TaskNode("", "", "")).completed}
-        
-        self.tasks[task_id] = task
+        # Update blocked_by for dependencies (missing ones block too)
+        tasks = self.tasks
+        blocked = set()
+        for dep in task.dependencies:
+            t = tasks.get(dep)
+            if t is None or not t.completed:
+                blocked.add(dep)
+        task.blocked_by = blocked
+        
+        if task_id in tasks:
+            tasks[task_id] = task
+            self._rebuild_indices()
+        else:
+            tasks[task_id] = task
+            i = self._slot(task_id)
+            self._rank[i] = len(tasks) - 1
+            adj, in_degree, state = self._adj, self._in_degree, self._state
+            degree = 0
+            for dep in task.dependencies:
+                j = self._slot(dep)
+                if state[j] == _SLOT_PENDING:
+                    degree += 1
+                adj[j].append(i)
+            in_degree[i] = degree
+            state[i] = _SLOT_PENDING
+            # Tasks added earlier may already depend on this one
+            for k in adj[i]:
+                if state[k]:
+                    in_degree[k] += 1
+            self._classify(task_id)
+        self._version += 1
         self._save()
         
         return task
@@ -106,12 +204,29 @@ class DependencyGraph:
         if task_id not in self.tasks or depends_on not in self.tasks:
             return
         
-        self.tasks[task_id].dependencies.add(depends_on)
+        task = self.tasks[task_id]
+        if depends_on in task.dependencies:
+            # Already an edge (re-adding it to the Kahn indices would
+            # double-count the in-degree); done unless blocked_by lags
+            if depends_on in task.blocked_by or self.tasks[depends_on].completed:
+                return
+        else:
+            i, j = self._idx[task_id], self._idx[depends_on]
+            dependents = self._adj[j]
+            dependents.append(i)
+            # Keep dependents in task order, as _rebuild_indices lists them
+            # (timsort: one pass over an already sorted list)
+            dependents.sort(key=self._rank.__getitem__)
+            if self._state[j] == _SLOT_PENDING:
+                self._in_degree[i] += 1
+            task.dependencies.add(depends_on)
         
         # Update blocked_by
         if not self.tasks[depends_on].completed:
             self.tasks[task_id].blocked_by.add(depends_on)
+            self._classify(task_id)
         
+        self._version += 1
         self._save()
     
     def mark_completed(self, task_id: str):
@@ -124,13 +239,30 @@ class DependencyGraph:
         if task_id not in self.tasks:
             return
         
+        i = self._idx[task_id]
+        dependents = self._adj[i]
+        state = self._state
+        if state[i] == _SLOT_PENDING:
+            in_degree = self._in_degree
+            for k in dependents:
+                if state[k]:
+                    in_degree[k] -= 1
+            state[i] = _SLOT_DONE
         self.tasks[task_id].completed = True
-        
-        # Unblock dependent tasks
-        for task in self.tasks.values():
-            if task_id in task.blocked_by:
-                task.blocked_by.remove(task_id)
-        
+        self._classify(task_id)
+        
+        # Unblock dependent tasks (only those that list task_id as a dependency)
+        tasks = self.tasks
+        ids = self._ids
+        for k in dependents:
+            dependent = ids[k]
+            task = tasks.get(dependent)
+            if task is not None and task_id in task.blocked_by:
+                task.blocked_by.discard(task_id)
+                if not task.blocked_by:
+                    self._classify(dependent)
+        
+        self._version += 1
         self._save()
     
     def get_topological_order(self) -> List[str]:
@@ -143,35 +275,37 @@ class DependencyGraph:
         Raises:
             ValueError: If circular dependency detected
         """
-        # Build adjacency list
-        in_degree = {task_id: 0 for task_id in self.tasks}
-        adj_list = defaultdict(list)
-        
-        for task_id, task in self.tasks.items():
-            if task.completed:
-                continue
-            
-            for dep in task.dependencies:
-                if dep in self.tasks and not self.tasks[dep].completed:
-                    adj_list[dep].append(task_id)
-                    in_degree[task_id] += 1
-        
-        # Kahn's algorithm
-        queue = deque([tid for tid, deg in in_degree.items() if deg == 0 and not self.tasks[tid].completed])
-        order = []
+        # Kahn's algorithm over the maintained integer indices (no rebuild)
+        in_degree = list(self._in_degree)
+        adj = self._adj
+        state = self._state
+        pending = _SLOT_PENDING
+        # Seed in task order (not slot order: a dependency referenced before
+        # its task was added holds an earlier slot) so ties break the same
+        # way on a live graph as on a reloaded one
+        idx = self._idx
+        queue = deque([
+            i for i in map(idx.__getitem__, self.tasks)
+            if state[i] == pending and not in_degree[i]
+        ])
+        order_idx = []
         
         while queue:
             current = queue.popleft()
-            order.append(current)
+            order_idx.append(current)
             
-            for neighbor in adj_list[current]:
+            for neighbor in adj[current]:
+                if state[neighbor] != pending:
+                    continue
                 in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
+                if not in_degree[neighbor]:
                     queue.append(neighbor)
         
-        # Check for cycles
-        incomplete = [tid for tid, task in self.tasks.items() if not task.completed]
-        if len(order) < len(incomplete):
+        ids = self._ids
+        order = [ids[i] for i in order_idx]
+        
+        # Check for cycles (every incomplete task is either ready or blocked)
+        if len(order) < len(self._ready) + len(self._blocked):
             raise ValueError("Circular dependency detected")
         
         return order
@@ -183,13 +317,11 @@ class DependencyGraph:
         Returns:
             List of (task_id, blocking_task_ids) tuples
         """
-        blocked = []
-        for task_id, task in self.tasks.items():
-            if not task.completed and task.blocked_by:
-                blockers = list(task.blocked_by)
-                blocked.append((task_id, blockers))
-        
-        return blocked
+        tasks = self.tasks
+        return [
+            (task_id, list(tasks[task_id].blocked_by))
+            for task_id in self._in_task_order(self._blocked)
+        ]
     
     def get_ready_tasks(self) -> List[str]:
         """
@@ -198,12 +330,7 @@ class DependencyGraph:
         Returns:
             List of task IDs ready for execution
         """
-        ready = []
-        for task_id, task in self.tasks.items():
-            if not task.completed and not task.blocked_by:
-                ready.append(task_id)
-        
-        return ready
+        return self._in_task_order(self._ready)
     
     def infer_dependencies_from_description(self, task_id: str) -> List[str]:
         """
@@ -224,27 +351,40 @@ class DependencyGraph:
         if task_id not in self.tasks:
             return []
         
+        # Pure over the graph contents: reuse results until the next mutation
+        if self._infer_version != self._version:
+            self._infer_cache.clear()
+            self._infer_version = self._version
+        cached = self._infer_cache.get(task_id)
+        if cached is not None:
+            return list(cached)
+        
         task = self.tasks[task_id]
         text = f"{task.title} {task.description}".lower()
         
-        # Patterns that indicate dependencies
-        patterns = [
-            r'depends?\s+on\s+([a-z0-9_-]+)',
-            r'after\s+([a-z0-9_-]+)',
-            r'requires?\s+([a-z0-9_-]+)',
-            r'blocked\s+by\s+([a-z0-9_-]+)',
-            r'needs\s+([a-z0-9_-]+)\s+to\s+be'
-        ]
+        # Report matches grouped by phrase, each in text order, and skip a
+        # match that overlaps the previous one of the same phrase - exactly
+        # what one re.findall per phrase would return
+        found = [[] for _ in range(_DEP_PHRASES)]
+        ends = [0] * _DEP_PHRASES
+        for m in _DEP_RE.finditer(text):
+            g = m.lastindex
+            k = g // 2
+            if m.start() < ends[k]:
+                continue
+            ends[k] = m.end(g)
+            found[k].append(m.group(g + 1))
         
         inferred = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
+        tasks = self.tasks
+        for matches in found:
             for match in matches:
                 # Check if match is a known task ID
-                if match in self.tasks and match != task_id:
+                if match in tasks and match != task_id:
                     inferred.append(match)
         
-        return inferred
+        self._infer_cache[task_id] = inferred
+        return list(inferred)
     
     def to_mermaid(self) -> str:
         """
@@ -253,6 +393,10 @@ class DependencyGraph:
         Returns:
             Mermaid markdown syntax
         """
+        cached = self._mermaid_cache
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        
         lines = ["```mermaid", "graph TD"]
         
         # Add nodes
@@ -267,14 +411,16 @@ class DependencyGraph:
                 lines.append(f'    {dep} --> {task_id}')
         
         lines.append("```")
-        return '\n'.join(lines)
+        mermaid = '\n'.join(lines)
+        self._mermaid_cache = (self._version, mermaid)
+        return mermaid
     
     def get_stats(self) -> Dict:
         """Get graph statistics."""
         total = len(self.tasks)
-        completed = sum(1 for t in self.tasks.values() if t.completed)
-        blocked = sum(1 for t in self.tasks.values() if t.blocked_by and not t.completed)
-        ready = sum(1 for t in self.tasks.values() if not t.blocked_by and not t.completed)
+        blocked = len(self._blocked)
+        ready = len(self._ready)
+        completed = total - blocked - ready
         
         return {
             'total_tasks': total,
@@ -290,23 +436,73 @@ class DependencyGraph:
             return
         
         try:
-            with open(self.graph_file, 'r') as f:
-                data = json.load(f)
+            raw = read_packed(self.graph_file)
+            if raw is not None:
                 self.tasks = {
                     tid: TaskNode.from_dict(tdata)
-                    for tid, tdata in data.items()
+                    for tid, tdata in loads(raw).items()
                 }
         except:
             pass
     
+    def _slot(self, task_id: str) -> int:
+        """Integer slot for task_id, allocating one on first sight."""
+        i = self._idx.get(task_id)
+        if i is None:
+            i = self._idx[task_id] = len(self._ids)
+            self._ids.append(task_id)
+            self._adj.append([])
+            self._in_degree.append(0)
+            self._state.append(_SLOT_UNKNOWN)
+            self._rank.append(-1)
+        return i
+    
+    def _in_task_order(self, task_ids) -> List[str]:
+        """task_ids sorted by position in self.tasks."""
+        rank, idx = self._rank, self._idx
+        return sorted(task_ids, key=lambda task_id: rank[idx[task_id]])
+    
+    def _rebuild_indices(self):
+        """Recompute the Kahn indices from self.tasks."""
+        tasks = self.tasks
+        self._idx, self._ids, self._adj, self._in_degree = {}, [], [], []
+        self._state = state = bytearray()
+        self._rank = rank = []
+        for position, (task_id, task) in enumerate(tasks.items()):
+            i = self._slot(task_id)
+            state[i] = _SLOT_DONE if task.completed else _SLOT_PENDING
+            rank[i] = position
+        adj, in_degree = self._adj, self._in_degree
+        for task_id, task in tasks.items():
+            i = self._idx[task_id]
+            for dep in task.dependencies:
+                j = self._slot(dep)
+                adj[j].append(i)
+                if state[j] == _SLOT_PENDING:
+                    in_degree[i] += 1
+        self._ready = {}
+        self._blocked = {}
+        for task_id in tasks:
+            self._classify(task_id)
+    
+    def _classify(self, task_id: str):
+        """File task_id under ready, blocked, or neither (completed)."""
+        self._ready.pop(task_id, None)
+        self._blocked.pop(task_id, None)
+        task = self.tasks[task_id]
+        if not task.completed:
+            (self._blocked if task.blocked_by else self._ready)[task_id] = None
+    
     def _save(self):
-        """Save graph to disk."""
+        """Save graph to disk (atomically; deferred inside batch())."""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
         try:
-            with open(self.graph_file, 'w') as f:
-                json.dump(
-                    {tid: t.to_dict() for tid, t in self.tasks.items()},
-                    f,
-                    indent=2
-                )
+            tmp = self.graph_file.with_suffix('.json.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(pack(dumps({tid: t.to_dict() for tid, t in self.tasks.items()})))
+            os.replace(tmp, self.graph_file)
         except:
             pass
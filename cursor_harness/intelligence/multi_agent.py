@@ -4,14 +4,18 @@ Multi-agent coordination for cursor-harness.
 Enables multiple harness instances to work together on complex tasks.
 """
 
-import json
+import os
 import time
-import hashlib
+import secrets
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from collections import Counter, defaultdict
+
+from .serialization import dumps, loads, pack, read_packed
 
 
 class AgentStatus(Enum):
@@ -23,6 +27,10 @@ class AgentStatus(Enum):
     CANCELLED = "cancelled"
 
 
+# Plain status strings for hot comparisons (skips Enum attribute + .value lookups)
+_PENDING, _RUNNING, _COMPLETED, _FAILED, _CANCELLED = (s.value for s in AgentStatus)
+
+
 @dataclass
 class AgentTask:
     """A task for an agent."""
@@ -37,7 +45,18 @@ class AgentTask:
     completed_at: Optional[float] = None
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Hand-built: asdict deep-copies every field (including result) recursively
+        return {
+            'task_id': self.task_id,
+            'agent_id': self.agent_id,
+            'description': self.description,
+            'dependencies': list(self.dependencies),
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+        }
     
     @staticmethod
     def from_dict(data: Dict) -> 'AgentTask':
@@ -54,7 +73,14 @@ class AgentMessage:
     timestamp: float
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Hand-built: asdict deep-copies content recursively
+        return {
+            'message_id': self.message_id,
+            'from_agent': self.from_agent,
+            'to_agent': self.to_agent,
+            'content': self.content,
+            'timestamp': self.timestamp,
+        }
     
     @staticmethod
     def from_dict(data: Dict) -> 'AgentMessage':
@@ -84,13 +110,68 @@ class MultiAgentCoordinator:
         self.coordination_dir.mkdir(parents=True, exist_ok=True)
         
         self.tasks_file = self.coordination_dir / f"{self.coordinator_id}_tasks.json"
-        self.messages_file = self.coordination_dir / f"{self.coordinator_id}_messages.json"
-        
-        self.tasks: Dict[str, AgentTask] = {}
-        self.messages: List[AgentMessage] = []
+        # Append-only JSONL log: one AgentMessage per line
+        self.messages_file = self.coordination_dir / f"{self.coordinator_id}_messages.jsonl"
+        self._legacy_messages_file = self.coordination_dir / f"{self.coordinator_id}_messages.json"
+        self._messages_fh = None  # Append handle, opened on first send
+        
+        # Loaded from disk on first access (see the tasks/messages properties)
+        self._tasks: Optional[Dict[str, AgentTask]] = None
+        self._messages: Optional[List[AgentMessage]] = None
+        self._messages_by_recipient: Dict[str, List[AgentMessage]] = defaultdict(list)
         self.agents: Dict[str, Dict[str, Any]] = {}
+        self._agent_task_counts: Counter = Counter()  # agent_id -> tasks assigned
+        self._status_counts: Counter = Counter()  # status -> number of tasks
+        # Readiness index: per-task count of dependency entries not yet
+        # COMPLETED, dep_id -> dependent task IDs, and PENDING tasks whose
+        # count is zero (dict as a set; listed in task order via _task_rank,
+        # each task's position in self.tasks)
+        self._unmet_deps: Dict[str, int] = {}
+        self._task_dependents: Dict[str, List[str]] = defaultdict(list)
+        self._ready_pending: Dict[str, None] = {}
+        self._task_rank: Dict[str, int] = {}
+        
+        self._batch_depth = 0  # > 0 inside batch(): saves are deferred
+        self._dirty_tasks = False
+        self._dirty_messages = False
+    
+    @property
+    def tasks(self) -> Dict[str, AgentTask]:
+        """Tasks by ID, loaded from disk on first access."""
+        if self._tasks is None:
+            self._load_tasks()
+        return self._tasks
+    
+    @property
+    def messages(self) -> List[AgentMessage]:
+        """Message history, loaded from disk on first access."""
+        if self._messages is None:
+            self._load_messages()
+        return self._messages
+    
+    @contextmanager
+    def batch(self):
+        """
+        Defer saving until the outermost batch exits.
         
-        self._load_state()
+        Use when creating many tasks or messages at once so each
+        file is written once instead of once per call.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                if self._dirty_tasks:
+                    self._save_tasks()
+                if self._dirty_messages:
+                    self._save_messages()
+                elif self._messages_fh is not None:
+                    try:
+                        self._messages_fh.flush()
+                    except:
+                        pass
     
     def register_agent(self, agent_id: str, capabilities: Optional[List[str]] = None):
         """
@@ -100,11 +181,13 @@ class MultiAgentCoordinator:
             agent_id: Agent identifier
             capabilities: Optional list of agent capabilities
         """
+        if self._tasks is None:
+            self._load_tasks()  # task_count comes from the stored tasks
         self.agents[agent_id] = {
             'agent_id': agent_id,
             'capabilities': capabilities or [],
             'registered_at': time.time(),
-            'task_count': 0
+            'task_count': self._agent_task_counts[agent_id]
         }
     
     def create_task(
@@ -136,7 +219,27 @@ class MultiAgentCoordinator:
             dependencies=dependencies or []
         )
         
+        previous = self.tasks.get(task_id)
+        if previous is not None:
+            self._count_task(previous.agent_id, -1)
+            self._status_counts[previous.status] -= 1
         self.tasks[task_id] = task
+        self._count_task(agent_id, 1)
+        self._status_counts[task.status] += 1
+        if previous is not None:
+            self._rebuild_readiness()  # Old edges and status no longer apply
+        else:
+            completed = _COMPLETED
+            tasks = self.tasks
+            self._task_rank[task_id] = len(tasks) - 1
+            unmet = 0
+            for dep_id in task.dependencies:
+                dep = tasks.get(dep_id)
+                if dep is None or dep.status != completed:
+                    unmet += 1
+                self._task_dependents[dep_id].append(task_id)
+            self._unmet_deps[task_id] = unmet
+            self._refresh_ready(task_id)
         self._save_tasks()
         
         return task
@@ -149,7 +252,7 @@ class MultiAgentCoordinator:
             task_id: Task ID
         """
         if task_id in self.tasks:
-            self.tasks[task_id].status = AgentStatus.RUNNING.value
+            self._set_status(task_id, _RUNNING)
             self.tasks[task_id].started_at = time.time()
             self._save_tasks()
     
@@ -162,7 +265,7 @@ class MultiAgentCoordinator:
             result: Task result
         """
         if task_id in self.tasks:
-            self.tasks[task_id].status = AgentStatus.COMPLETED.value
+            self._set_status(task_id, _COMPLETED)
             self.tasks[task_id].result = result
             self.tasks[task_id].completed_at = time.time()
             self._save_tasks()
@@ -176,7 +279,7 @@ class MultiAgentCoordinator:
             error: Error message
         """
         if task_id in self.tasks:
-            self.tasks[task_id].status = AgentStatus.FAILED.value
+            self._set_status(task_id, _FAILED)
             self.tasks[task_id].error = error
             self.tasks[task_id].completed_at = time.time()
             self._save_tasks()
@@ -207,7 +310,8 @@ class MultiAgentCoordinator:
         )
         
         self.messages.append(message)
-        self._save_messages()
+        self._messages_by_recipient[to_agent].append(message)
+        self._append_message(message)
         
         return message
     
@@ -221,7 +325,9 @@ class MultiAgentCoordinator:
         Returns:
             List of messages
         """
-        return [m for m in self.messages if m.to_agent == agent_id]
+        if self._messages is None:
+            self._load_messages()  # Also builds the recipient index
+        return list(self._messages_by_recipient.get(agent_id, ()))
     
     def get_ready_tasks(self) -> List[AgentTask]:
         """
@@ -230,21 +336,11 @@ class MultiAgentCoordinator:
         Returns:
             List of ready tasks
         """
-        ready = []
-        for task in self.tasks.values():
-            if task.status != AgentStatus.PENDING.value:
-                continue
-            
-            # Check if all dependencies are completed
-            deps_satisfied = all(
-                self.tasks.get(dep_id, AgentTask("", "", "")).status == AgentStatus.COMPLETED.value
-                for dep_id in task.dependencies
-            )
-            
-            if deps_satisfied:
-                ready.append(task)
-        
-        return ready
+        tasks = self.tasks
+        return [
+            tasks[task_id]
+            for task_id in sorted(self._ready_pending, key=self._task_rank.__getitem__)
+        ]
     
     def get_tasks_for_agent(self, agent_id: str) -> List[AgentTask]:
         """
@@ -276,7 +372,7 @@ class MultiAgentCoordinator:
         return {
             task.task_id: task.result
             for task in tasks
-            if task.status == AgentStatus.COMPLETED.value
+            if task.status == _COMPLETED
         }
     
     def get_status(self) -> Dict[str, Any]:
@@ -287,9 +383,7 @@ class MultiAgentCoordinator:
             Status dict
         """
         total_tasks = len(self.tasks)
-        by_status = {}
-        for task in self.tasks.values():
-            by_status[task.status] = by_status.get(task.status, 0) + 1
+        by_status = {status: n for status, n in self._status_counts.items() if n}
         
         return {
             'coordinator_id': self.coordinator_id,
@@ -319,63 +413,166 @@ class MultiAgentCoordinator:
             self.register_agent(default_id)
             return default_id
         
-        # Round-robin assignment
-        agent_tasks = {aid: 0 for aid in self.agents}
-        for task in self.tasks.values():
-            if task.agent_id in agent_tasks:
-                agent_tasks[task.agent_id] += 1
-        
-        # Assign to agent with fewest tasks
-        return min(agent_tasks.items(), key=lambda x: x[1])[0]
+        # Round-robin: assign to agent with fewest tasks (counts kept by create_task)
+        return min(self.agents.items(), key=lambda kv: kv[1]['task_count'])[0]
+    
+    def _count_task(self, agent_id: str, delta: int):
+        """Adjust an agent's assigned-task count."""
+        self._agent_task_counts[agent_id] += delta
+        agent = self.agents.get(agent_id)
+        if agent is not None:
+            agent['task_count'] = self._agent_task_counts[agent_id]
+    
+    def _set_status(self, task_id: str, status: str):
+        """Change a task's status, keeping the readiness index in step."""
+        task = self.tasks[task_id]
+        completed = _COMPLETED
+        was_completed = task.status == completed
+        self._status_counts[task.status] -= 1
+        self._status_counts[status] += 1
+        task.status = status
+        if was_completed == (status == completed):
+            self._refresh_ready(task_id)
+        elif was_completed:
+            self._rebuild_readiness()  # Rare: dependents are blocked again
+        else:
+            self._refresh_ready(task_id)
+            unmet = self._unmet_deps
+            for dependent in self._task_dependents.get(task_id, ()):
+                unmet[dependent] -= 1
+                if not unmet[dependent]:
+                    self._refresh_ready(dependent)
+    
+    def _refresh_ready(self, task_id: str):
+        """Add or drop task_id from the ready set after its status/unmet count changed."""
+        if (self.tasks[task_id].status == _PENDING
+                and not self._unmet_deps.get(task_id)):
+            self._ready_pending[task_id] = None
+        else:
+            self._ready_pending.pop(task_id, None)
+    
+    def _rebuild_readiness(self):
+        """Recompute the readiness index from self.tasks in one pass."""
+        tasks = self.tasks
+        completed = _COMPLETED
+        self._unmet_deps = unmet = {}
+        self._task_dependents = dependents = defaultdict(list)
+        self._ready_pending = {}
+        self._task_rank = {task_id: position for position, task_id in enumerate(tasks)}
+        for task_id, task in tasks.items():
+            count = 0
+            for dep_id in task.dependencies:
+                dep = tasks.get(dep_id)
+                if dep is None or dep.status != completed:
+                    count += 1
+                dependents[dep_id].append(task_id)
+            unmet[task_id] = count
+            self._refresh_ready(task_id)
     
     def _generate_id(self) -> str:
-        """Generate unique ID."""
-        content = f"{time.time()}_{id(self)}"
-        return hashlib.md5(content.encode()).hexdigest()[:12]
+        """Generate unique ID (12 hex chars from the OS RNG)."""
+        return secrets.token_hex(6)
     
-    def _load_state(self):
-        """Load coordinator state from disk."""
-        # Load tasks
+    def _load_tasks(self):
+        """Load tasks from disk and build the task indices."""
+        self._tasks = {}
         if self.tasks_file.exists():
             try:
-                with open(self.tasks_file, 'r') as f:
-                    data = json.load(f)
-                    self.tasks = {
+                raw = read_packed(self.tasks_file)
+                if raw is not None:
+                    self._tasks = {
                         tid: AgentTask.from_dict(tdata)
-                        for tid, tdata in data.items()
+                        for tid, tdata in loads(raw).items()
                     }
             except:
                 pass
         
-        # Load messages
+        self._agent_task_counts = Counter(t.agent_id for t in self._tasks.values())
+        self._status_counts = Counter(t.status for t in self._tasks.values())
+        for agent_id, agent in self.agents.items():
+            agent['task_count'] = self._agent_task_counts[agent_id]
+        self._rebuild_readiness()
+    
+    def _load_messages(self):
+        """Load messages from disk (migrating a legacy messages.json once)."""
+        self._messages = []
         if self.messages_file.exists():
+            torn = False
             try:
-                with open(self.messages_file, 'r') as f:
-                    data = json.load(f)
-                    self.messages = [AgentMessage.from_dict(m) for m in data]
+                with open(self.messages_file, 'rb') as f:
+                    for line in f:
+                        try:
+                            self._messages.append(AgentMessage.from_dict(loads(line)))
+                        except (ValueError, TypeError):
+                            torn = True  # Partial line from an interrupted append
             except:
                 pass
+            if torn:
+                self._save_messages()  # Compact so later appends start on a clean line
+        elif self._legacy_messages_file.exists():
+            try:
+                with open(self._legacy_messages_file, 'rb') as f:
+                    self._messages = [AgentMessage.from_dict(m) for m in loads(f.read())]
+                self._save_messages()
+            except:
+                pass
+        
+        by_recipient = self._messages_by_recipient
+        for message in self._messages:
+            by_recipient[message.to_agent].append(message)
     
     def _save_tasks(self):
-        """Save tasks to disk."""
+        """Save tasks to disk (atomically; deferred inside batch())."""
+        if self._batch_depth:
+            self._dirty_tasks = True
+            return
+        self._dirty_tasks = False
+        try:
+            tmp = self.tasks_file.with_suffix('.json.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(pack(dumps({tid: t.to_dict() for tid, t in self.tasks.items()})))
+            os.replace(tmp, self.tasks_file)
+        except:
+            pass
+    
+    def _append_message(self, message: AgentMessage):
+        """Append one message to the log - O(1) bytes per send instead of a full rewrite."""
         try:
-            with open(self.tasks_file, 'w') as f:
-                json.dump(
-                    {tid: t.to_dict() for tid, t in self.tasks.items()},
-                    f,
-                    indent=2
-                )
+            if self._messages_fh is None:
+                self._messages_fh = open(self.messages_file, 'ab')
+            self._messages_fh.write(dumps(message.to_dict()) + b'\n')
+            if not self._batch_depth:
+                self._messages_fh.flush()  # Else flushed once when the batch exits
         except:
             pass
     
     def _save_messages(self):
-        """Save messages to disk."""
+        """Rewrite (compact) the whole message log atomically; deferred inside batch()."""
+        if self._batch_depth:
+            self._dirty_messages = True
+            return
+        self._dirty_messages = False
+        self._close_messages_fh()  # It would point at the replaced inode
         try:
-            with open(self.messages_file, 'w') as f:
-                json.dump(
-                    [m.to_dict() for m in self.messages],
-                    f,
-                    indent=2
-                )
+            tmp = self.messages_file.with_suffix('.jsonl.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(b''.join(dumps(m.to_dict()) + b'\n' for m in self.messages))
+            os.replace(tmp, self.messages_file)
         except:
             pass
+    
+    def _close_messages_fh(self):
+        fh = getattr(self, '_messages_fh', None)  # May be unset if __init__ failed
+        if fh is not None:
+            try:
+                fh.close()
+            except:
+                pass
+            self._messages_fh = None
+    
+    def close(self):
+        """Release the message log handle."""
+        self._close_messages_fh()
+    
+    def __del__(self):
+        self.close()
@@ -4,13 +4,28 @@ Error pattern database for adaptive prompting.
 Stores error patterns across sessions and tracks successful resolutions.
 """
 
-import json
+import atexit
 import hashlib
+import time
+import weakref
 from pathlib import Path
 from typing import List, Dict, Optional, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from .async_writer import writer
+from .serialization import dumps, loads
+
+
+# Debounced saves: record_* only marks the database dirty; it is written when
+# this much time has passed since the last save or this many changes piled up
+# (and always on flush(force=True), close() and interpreter exit)
+_SAVE_INTERVAL = 2.0
+_SAVE_EVERY = 32
+
+# Live databases, flushed at exit (weak: open databases are not kept alive)
+_open_databases = weakref.WeakSet()
+
 
 @dataclass
 class ErrorPattern:
@@ -98,32 +113,68 @@ class PatternDatabase:
         self.db_file = self.db_dir / "patterns.json"
         
         self.patterns: Dict[str, ErrorPattern] = {}
+        self._dirty = False
+        self._pending = 0  # Changes since the last save
+        self._last_save = 0.0  # time.monotonic() of the last save
         self._load()
+        _open_databases.add(self)
     
     def _load(self):
         """Load patterns from disk."""
+        writer.flush()  # A queued save of this file must land first
         if not self.db_file.exists():
             return
         
         try:
-            with open(self.db_file, 'r') as f:
-                data = json.load(f)
-                self.patterns = {
-                    pid: ErrorPattern.from_dict(pdata)
-                    for pid, pdata in data.items()
-                }
+            data = loads(self.db_file.read_bytes())
+            self.patterns = {
+                pid: ErrorPattern.from_dict(pdata)
+                for pid, pdata in data.items()
+            }
         except Exception as e:
             print(f"   ⚠️  Failed to load pattern database: {e}")
     
+    def _mark_dirty(self):
+        """Note a change; save now only if the debounce thresholds are crossed."""
+        self._dirty = True
+        self._pending += 1
+        self.flush()
+    
+    def flush(self, force: bool = False):
+        """
+        Write pending changes to disk.
+        
+        Args:
+            force: Save regardless of the debounce thresholds
+        """
+        if not self._dirty:
+            return
+        if (force or self._pending >= _SAVE_EVERY
+                or time.monotonic() - self._last_save >= _SAVE_INTERVAL):
+            self._save()
+    
+    def close(self):
+        """Flush any pending changes and wait until they are on disk."""
+        self.flush(force=True)
+        writer.flush()
+    
+    def __del__(self):
+        try:
+            if self.db_dir.exists():  # The project may be gone already (temp dirs)
+                self.close()
+        except:
+            pass
+    
     def _save(self):
         """Save patterns to disk."""
+        self._dirty = False
+        self._pending = 0
+        self._last_save = time.monotonic()
         try:
-            with open(self.db_file, 'w') as f:
-                json.dump(
-                    {pid: p.to_dict() for pid, p in self.patterns.items()},
-                    f,
-                    indent=2
-                )
+            writer.write(self.db_file, dumps(
+                {pid: p.to_dict() for pid, p in self.patterns.items()},
+                indent=True
+            ))
         except Exception as e:
             print(f"   ⚠️  Failed to save pattern database: {e}")
     
@@ -172,7 +223,7 @@ class PatternDatabase:
             )
             self.patterns[pattern_id] = pattern
         
-        self._save()
+        self._mark_dirty()
         return pattern_id
     
     def record_resolution(
@@ -206,7 +257,7 @@ class PatternDatabase:
         if pattern.occurrence_count > 0:
             pattern.success_rate = pattern.resolution_count / pattern.occurrence_count
         
-        self._save()
+        self._mark_dirty()
     
     def get_relevant_patterns(
         self,
@@ -307,3 +358,13 @@ class PatternDatabase:
             'avg_success_rate': avg_success,
             'db_file': str(self.db_file)
         }
+
+
+def _flush_all():
+    """Write out every live database's pending changes at exit."""
+    for db in list(_open_databases):
+        if db.db_dir.exists():
+            db.flush(force=True)
+
+
+atexit.register(_flush_all)
@@ -4,7 +4,6 @@ Performance profiling for cursor-harness sessions.
 Tracks timing, resource usage, and throughput metrics.
 """
 
-import json
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -12,6 +11,9 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from contextlib import contextmanager
 
+from .async_writer import writer
+from .serialization import dumps, loads
+
 
 @dataclass
 class ProfileMetric:
@@ -215,8 +217,7 @@ class PerformanceProfiler:
         """Save profile to disk."""
         profile_file = self.profiling_dir / f"{self.session_id}.json"
         try:
-            with open(profile_file, 'w') as f:
-                json.dump(self.profile.to_dict(), f, indent=2)
+            writer.write(profile_file, dumps(self.profile.to_dict(), indent=True))
         except:
             pass
     
@@ -269,17 +270,17 @@ class PerformanceProfiler:
         profiling_dir = Path(project_dir) / ".cursor" / "profiling"
         profile_file = profiling_dir / f"{session_id}.json"
         
+        writer.flush()  # A queued save of this profile must land first
         if not profile_file.exists():
             return None
         
         try:
-            with open(profile_file, 'r') as f:
-                data = json.load(f)
-                profile = SessionProfile.from_dict(data)
-                
-                profiler = PerformanceProfiler(project_dir, session_id)
-                profiler.profile = profile
-                return profiler
+            data = loads(profile_file.read_bytes())
+            profile = SessionProfile.from_dict(data)
+            
+            profiler = PerformanceProfiler(project_dir, session_id)
+            profiler.profile = profile
+            return profiler
         except:
             return None
     
@@ -295,6 +296,7 @@ class PerformanceProfiler:
             List of session IDs
         """
         profiling_dir = Path(project_dir) / ".cursor" / "profiling"
+        writer.flush()  # Queued profiles must exist on disk to be listed
         if not profiling_dir.exists():
             return []
         
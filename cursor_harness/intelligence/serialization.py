@@ -0,0 +1,76 @@
+"""
+JSON (de)serialization for intelligence state.
+
+Uses orjson when it is installed and falls back to the stdlib json module,
+so every module reads and writes the same bytes either way. Large state
+files can additionally be zstd-compressed (pack/read_packed).
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import orjson  # Optional: much faster (de)serialization
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard  # Optional: compress large state files
+except ImportError:
+    zstandard = None
+
+# State files at least this large are zstd-compressed when zstandard is
+# installed. Loads detect the format from the frame magic, so plain and
+# compressed files coexist under the same name
+_COMPRESS_MIN_BYTES = 1 << 20
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """
+    Serialize to JSON bytes (orjson when available).
+
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print with 2-space indentation (compact otherwise)
+    """
+    if orjson is not None:
+        # Contexts, metadata and task results are caller-supplied: allow
+        # non-str dict keys, as json does
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; let json have a go
+    if indent:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def pack(data: bytes) -> bytes:
+    """zstd-compress large JSON payloads (when zstandard is available)."""
+    if zstandard is not None and len(data) >= _COMPRESS_MIN_BYTES:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def read_packed(path: Path) -> Optional[bytes]:
+    """Read a state file written by pack; None if it cannot be decoded here."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw[:4] != _ZSTD_MAGIC:
+        return raw
+    if zstandard is None:
+        # Set it aside rather than let the next save overwrite it
+        kept = path.with_name(path.name + '.zst')
+        os.replace(path, kept)
+        print(f"⚠️  {path.name} is zstd-compressed; install zstandard to read it (kept as {kept.name})")
+        return None
+    return zstandard.ZstdDecompressor().decompress(raw)
@@ -29,12 +29,8 @@ class E2ETester:
             host, port = url.replace('http://', '').split(':')
             port = int(port)
             
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            
-            return result == 0
+            with socket.create_connection((host, port), timeout=2):
+                return True
         except:
             return False
 
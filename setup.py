@@ -10,6 +10,9 @@ setup(
     install_requires=[
         "anthropic>=0.39.0",
     ],
+    extras_require={
+        "fast": ["orjson>=3.6", "rapidfuzz>=2.0", "zstandard>=0.15"],
+    },
     entry_points={
         "console_scripts": [
             "cursor-harness=cursor_harness.cli:main",
@@ -136,9 +136,25 @@ def test_pattern_persistence():
         assert db2.patterns[pattern_id].error_type == "verification_failure"
 
 
+def test_pattern_save_debounce():
+    """Test that saves right after a save are deferred until flush."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        
+        db1 = PatternDatabase(project_dir)
+        db1.record_error("test_failure", "First failure")  # Saved immediately
+        db1.record_error("test_failure", "Second failure")  # Within the debounce window
+        
+        assert len(PatternDatabase(project_dir).patterns) == 1
+        
+        db1.flush(force=True)
+        assert len(PatternDatabase(project_dir).patterns) == 2
+
+
 if __name__ == '__main__':
     test_pattern_recording()
     test_pattern_resolution()
     test_adaptive_prompter_augmentation()
     test_pattern_persistence()
+    test_pattern_save_debounce()
     print("✅ All adaptive prompting tests passed!")
@@ -0,0 +1,39 @@
+"""Tests for the background intelligence writer."""
+
+import tempfile
+from pathlib import Path
+
+from cursor_harness.intelligence.async_writer import AsyncWriter, ASYNC_MIN_BYTES
+
+
+def test_small_write_is_inline():
+    """Test that small payloads are on disk when write() returns."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "small.json"
+        writer = AsyncWriter()
+        
+        writer.write(path, b'{"a": 1}')
+        
+        assert path.read_bytes() == b'{"a": 1}'
+
+
+def test_large_writes_coalesce():
+    """Test that queued writes land after flush and the latest payload wins."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "large.json"
+        writer = AsyncWriter()
+        
+        first = b'1' * ASYNC_MIN_BYTES
+        second = b'2' * ASYNC_MIN_BYTES
+        writer.write(path, first)
+        writer.write(path, second)
+        writer.write(path, b'3')  # Small, but must not overtake the queued writes
+        
+        assert writer.flush(timeout=5)
+        assert path.read_bytes() == b'3'
+
+
+if __name__ == '__main__':
+    test_small_write_is_inline()
+    test_large_writes_coalesce()
+    print("✅ All async writer tests passed!")
@@ -1,9 +1,11 @@
 """Tests for auto-recovery system."""
 
+import json
 import tempfile
 from pathlib import Path
 import time
 
+from cursor_harness.intelligence import auto_recovery
 from cursor_harness.intelligence.auto_recovery import AutoRecovery, RecoveryStrategy, RecoveryAction
 
 
@@ -176,6 +178,15 @@ def test_stats():
         assert 'by_failure_type' in stats
         assert stats['by_failure_type']['verification_failure'] == 1
         assert stats['by_failure_type']['timeout'] == 1
+        
+        # The result is the caller's to mutate
+        stats['by_strategy'].clear()
+        stats['by_failure_type']['timeout'] = 99
+        stats['current_state']['consecutive_failures'] = 99
+        fresh = recovery.get_stats()
+        assert fresh['by_failure_type']['timeout'] == 1
+        assert sum(fresh['by_strategy'].values()) == 3
+        assert fresh['current_state']['consecutive_failures'] != 99
 
 
 def test_persistence():
@@ -198,6 +209,79 @@ def test_persistence():
         assert recovery2.state['consecutive_failures'] == 5
 
 
+def test_non_str_context_keys_persist():
+    """Test that actions whose context has non-string keys are still persisted."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        
+        recovery1 = AutoRecovery(project_dir)
+        recovery1.detect_and_recover("loop_detected", {1: 'x'})
+        recovery1.close()
+        
+        recovery2 = AutoRecovery(project_dir)
+        assert len(recovery2.actions) == 1
+
+
+def test_history_beyond_memory_window():
+    """Test that actions beyond the in-memory window stay on disk and in stats."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        saved = auto_recovery._MAX_ACTIONS
+        auto_recovery._MAX_ACTIONS = 3
+        try:
+            recovery1 = AutoRecovery(project_dir)
+            for _ in range(5):
+                recovery1.detect_and_recover("loop_detected", {})
+            recovery1.close()
+            assert len(recovery1.actions) == 3
+            assert recovery1.get_stats()['total_recoveries'] == 5
+            
+            with open(recovery1.actions_file, 'a') as f:
+                f.write('{"action_id": "torn')  # Interrupted append
+            
+            recovery2 = AutoRecovery(project_dir)
+            assert len(recovery2.actions) == 3
+            assert recovery2.actions[-2:] == recovery2.get_recent_actions(2)
+            assert recovery2.get_stats()['total_recoveries'] == 5
+            
+            # Compaction on load dropped the torn line and nothing else
+            lines = recovery2.actions_file.read_text().splitlines()
+            assert len(lines) == 5
+        finally:
+            auto_recovery._MAX_ACTIONS = saved
+
+
+def test_legacy_actions_migration():
+    """Test that a legacy actions.json is loaded and migrated to the JSONL log."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        recovery_dir = project_dir / ".cursor" / "recovery"
+        recovery_dir.mkdir(parents=True)
+        
+        legacy = RecoveryAction(
+            action_id="old1",
+            timestamp="2026-02-13T18:00:00",
+            failure_type="timeout",
+            strategy="retry_with_backoff",
+            parameters={}
+        )
+        (recovery_dir / "actions.json").write_text(json.dumps([legacy.to_dict()]))
+        
+        recovery = AutoRecovery(project_dir)
+        assert [a.action_id for a in recovery.actions] == ["old1"]
+        assert (recovery_dir / "actions.jsonl").exists()
+        
+        # New actions append to the log and survive a restart alongside the old one
+        recovery.detect_and_recover("loop_detected", {})
+        with open(recovery_dir / "actions.jsonl", 'a') as f:
+            f.write('{"action_id": "torn')  # Interrupted append
+        
+        reloaded = AutoRecovery(project_dir)
+        assert len(reloaded.actions) == 2
+        assert reloaded.actions[0].action_id == "old1"
+        assert reloaded.actions[1].failure_type == "loop_detected"
+
+
 def test_escalating_strategies():
     """Test that strategies escalate with consecutive failures."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -230,5 +314,8 @@ if __name__ == '__main__':
     test_mark_success()
     test_stats()
     test_persistence()
+    test_non_str_context_keys_persist()
+    test_history_beyond_memory_window()
+    test_legacy_actions_migration()
     test_escalating_strategies()
     print("✅ All auto-recovery tests passed!")
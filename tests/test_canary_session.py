@@ -4,6 +4,7 @@ import tempfile
 from pathlib import Path
 import subprocess
 
+from cursor_harness.intelligence import canary_session
 from cursor_harness.intelligence.canary_session import CanarySession, CanaryResult
 
 
@@ -57,6 +58,45 @@ def test_diff_score_calculation():
         assert 0.0 < score3 < 0.3
 
 
+def _reference_lcs(a, b):
+    """Textbook O(n*m) LCS length."""
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def test_diff_score_metric():
+    """Test that the pure-Python diff metric is the exact LCS ratio (rapidfuzz's Indel)."""
+    outputs = [
+        "",
+        "OK",
+        "All 12 tests passed",
+        "All 12 tests passed\nCoverage: 87%",
+        "11 passed, 1 failed\nFAIL: test_login",
+        "ERROR: Command '['cursor-agent']' timed out after 300 seconds",
+        "Created src/app.py\nCreated tests/test_app.py\nAll 12 tests passed",
+        "x" * 300,
+    ]
+    saved = canary_session.Indel
+    canary_session.Indel = None
+    try:
+        for a in outputs:
+            for b in outputs:
+                expected = 2 * _reference_lcs(a, b) / (len(a) + len(b)) if a or b else 1.0
+                assert abs(canary_session._lcs_similarity(a, b) - expected) < 1e-12
+    finally:
+        canary_session.Indel = saved
+    
+    if saved is not None:
+        for a in outputs:
+            for b in outputs:
+                assert abs(saved.normalized_similarity(a, b) - canary_session._lcs_similarity(a, b)) < 1e-12
+
+
 def test_regression_detection():
     """Test regression detection logic."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -172,10 +212,48 @@ def test_persistence():
         assert canary2.results[0].canary_id == "persist-test"
 
 
+def test_results_paged_to_archive():
+    """Test that results beyond the in-memory window are archived, not dropped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        saved = canary_session._MAX_RESULTS
+        canary_session._MAX_RESULTS = 2
+        try:
+            canary1 = CanarySession(project_dir)
+            for i in range(5):
+                canary1.results.append(CanaryResult(
+                    canary_id=f"r{i}",
+                    timestamp="2026-02-13T12:00:00",
+                    control_output="OK",
+                    canary_output="OK",
+                    control_duration=1.0,
+                    canary_duration=1.0,
+                    diff_score=0.0,
+                    passed=i % 2 == 0,
+                    regression_detected=False
+                ))
+                canary1._save_results()
+            
+            assert [r.canary_id for r in canary1.results] == ["r3", "r4"]
+            assert canary1.get_stats()['total_tests'] == 5
+            assert canary1.get_stats()['passed'] == 3
+            
+            canary2 = CanarySession(project_dir)
+            assert [r.canary_id for r in canary2.get_recent_results()] == ["r3", "r4"]
+            stats = canary2.get_stats()
+            assert stats['total_tests'] == 5
+            assert stats['passed'] == 3
+            assert canary2.get_pass_rate() == 0.6
+        finally:
+            canary_session._MAX_RESULTS = saved
+
+
 if __name__ == '__main__':
     test_canary_result()
     test_diff_score_calculation()
+    test_diff_score_metric()
     test_regression_detection()
     test_canary_stats()
     test_persistence()
+    test_results_paged_to_archive()
     print("✅ All canary session tests passed!")
@@ -160,6 +160,214 @@ def test_persistence():
         assert "task1" in graph2.tasks["task2"].dependencies
 
 
+def test_batch_defers_save():
+    """Test batch() writes the graph once, on exit."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        with graph.batch():
+            graph.add_task("task1", "Task 1", "Description")
+            graph.add_task("task2", "Task 2", "Description", dependencies=["task1"])
+            assert not graph.graph_file.exists()
+        
+        assert graph.graph_file.exists()
+        assert len(DependencyGraph(project_dir).tasks) == 2
+
+
+def test_ready_tasks_in_task_order():
+    """Test ready/blocked tasks are listed in task order, live and after reload."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("a", "Task A", "First")
+        graph.add_task("b", "Task B", "Second", dependencies=["a"])
+        graph.add_task("c", "Task C", "Third")
+        graph.add_task("d", "Task D", "Fourth", dependencies=["a"])
+        graph.add_task("e", "Task E", "Fifth", dependencies=["c"])
+        assert graph.get_ready_tasks() == ["a", "c"]
+        assert [t for t, _ in graph.get_blocked_tasks()] == ["b", "d", "e"]
+        
+        graph.mark_completed("c")  # e becomes ready before b
+        graph.mark_completed("a")
+        assert graph.get_ready_tasks() == ["b", "d", "e"]
+        assert DependencyGraph(project_dir).get_ready_tasks() == ["b", "d", "e"]
+
+
+def test_topological_order_stable_across_reload():
+    """Test ties break by task order, even for dependencies added before their tasks."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("x", "Task X", "Last", dependencies=["z", "y"])
+        graph.add_task("y", "Task Y", "First")
+        graph.add_task("z", "Task Z", "Second")
+        graph.add_task("w", "Task W", "Fourth")
+        graph.add_dependency("w", "y")
+        
+        assert graph.get_topological_order() == ["y", "z", "w", "x"]
+        assert DependencyGraph(project_dir).get_topological_order() == ["y", "z", "w", "x"]
+
+
+def test_infer_dependencies_order():
+    """Test inferred dependencies are grouped by phrase, each in text order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = DependencyGraph(Path(tmpdir))
+        
+        for task_id in ("x", "y", "z"):
+            graph.add_task(task_id, task_id, "")
+        graph.add_task("t", "Task", "after y, depends on x, requires z, after after z")
+        
+        # depends-on matches, then after matches, then requires matches; the
+        # second "after" overlaps the first, so the z after it is not reported
+        assert graph.infer_dependencies_from_description("t") == ["x", "y", "z"]
+
+
+def _snapshot(graph):
+    """Everything the incremental indices feed, for live/reloaded comparisons."""
+    try:
+        order = graph.get_topological_order()
+    except ValueError:
+        order = "cycle"
+    stats = graph.get_stats()
+    stats.pop('graph_file')
+    blocked = [(task_id, sorted(blockers)) for task_id, blockers in graph.get_blocked_tasks()]
+    return order, graph.get_ready_tasks(), blocked, stats
+
+
+def test_forward_referenced_dependency():
+    """Test a dependency named before its task exists."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("b", "Task B", "Second", dependencies=["a"])
+        assert graph.get_ready_tasks() == []
+        assert graph.get_blocked_tasks() == [("b", ["a"])]
+        assert graph.get_topological_order() == ["b"]  # Unknown tasks impose no order
+        
+        graph.add_task("a", "Task A", "First")
+        assert graph.get_ready_tasks() == ["a"]
+        assert graph.get_topological_order() == ["a", "b"]
+        assert _snapshot(graph) == _snapshot(DependencyGraph(project_dir))
+        
+        graph.mark_completed("a")
+        assert graph.get_ready_tasks() == ["b"]
+        assert graph.get_topological_order() == ["b"]
+        assert graph.get_stats()['completed'] == 1
+        assert _snapshot(graph) == _snapshot(DependencyGraph(project_dir))
+
+
+def test_readd_existing_task():
+    """Test re-adding a task replaces its dependencies and status."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("a", "Task A", "First")
+        graph.add_task("b", "Task B", "Second", dependencies=["a"])
+        graph.add_task("c", "Task C", "Third", dependencies=["b"])
+        graph.mark_completed("a")
+        
+        # Back to incomplete, and b now depends on c
+        graph.add_task("a", "Task A", "Redo")
+        graph.add_task("b", "Task B", "Second", dependencies=["c"])
+        assert graph.get_ready_tasks() == ["a"]
+        stats = graph.get_stats()
+        assert (stats['completed'], stats['ready'], stats['blocked']) == (0, 1, 2)
+        try:
+            graph.get_topological_order()
+            assert False, "b and c depend on each other"
+        except ValueError:
+            pass
+        
+        graph.add_task("c", "Task C", "Third")
+        assert graph.get_topological_order() == ["a", "c", "b"]
+        assert graph.get_ready_tasks() == ["a", "c"]
+        assert _snapshot(graph) == _snapshot(DependencyGraph(project_dir))
+
+
+def test_add_dependency_after_completion():
+    """Test adding edges to and from completed tasks, and repeating an edge."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("a", "Task A", "First")
+        graph.add_task("b", "Task B", "Second")
+        graph.add_task("c", "Task C", "Third")
+        graph.mark_completed("a")
+        
+        # A completed dependency does not block
+        graph.add_dependency("b", "a")
+        assert graph.get_ready_tasks() == ["b", "c"]
+        assert graph.tasks["b"].blocked_by == set()
+        
+        # Adding the same edge twice counts it once
+        graph.add_dependency("c", "b")
+        graph.add_dependency("c", "b")
+        assert graph.get_ready_tasks() == ["b"]
+        assert graph.get_topological_order() == ["b", "c"]
+        graph.mark_completed("b")
+        assert graph.get_ready_tasks() == ["c"]
+        assert graph.get_topological_order() == ["c"]
+        
+        # A completed task depending on an incomplete one changes nothing
+        graph.add_dependency("a", "c")
+        assert graph.get_topological_order() == ["c"]
+        assert _snapshot(graph) == _snapshot(DependencyGraph(project_dir))
+
+
+def test_cycle_detection():
+    """Test cycles are reported until a task on the cycle completes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("a", "Task A", "First", dependencies=["c"])
+        graph.add_task("b", "Task B", "Second", dependencies=["a"])
+        graph.add_task("c", "Task C", "Third", dependencies=["b"])
+        graph.add_task("d", "Task D", "Fourth")
+        
+        for g in (graph, DependencyGraph(project_dir)):
+            try:
+                g.get_topological_order()
+                assert False, "a -> c -> b -> a is a cycle"
+            except ValueError:
+                pass
+        assert graph.get_ready_tasks() == ["d"]
+        
+        graph.mark_completed("c")
+        assert graph.get_topological_order() == ["a", "d", "b"]
+        assert _snapshot(graph) == _snapshot(DependencyGraph(project_dir))
+
+
+def test_indices_match_after_reload():
+    """Test the incrementally maintained indices agree with a fresh load."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        graph = DependencyGraph(project_dir)
+        
+        graph.add_task("t3", "T3", "", dependencies=["t1", "t2"])
+        graph.add_task("t1", "T1", "")
+        graph.add_task("t4", "T4", "", dependencies=["t3", "t5"])
+        graph.add_task("t2", "T2", "", dependencies=["t1"])
+        graph.add_dependency("t2", "t4")
+        graph.add_task("t5", "T5", "")
+        checks = [_snapshot(graph)]
+        
+        graph.mark_completed("t4")
+        graph.add_dependency("t5", "t1")
+        graph.mark_completed("t1")
+        checks.append(_snapshot(graph))
+        
+        assert checks[-1] == _snapshot(DependencyGraph(project_dir))
+        assert checks[-1][0] == ["t2", "t5", "t3"]
+        assert checks[0][0] == "cycle"  # t2 -> t4 -> t3 -> t2
+
+
 if __name__ == '__main__':
     test_add_task()
     test_dependencies()
@@ -169,4 +377,13 @@ if __name__ == '__main__':
     test_get_blocked_tasks()
     test_mermaid_output()
     test_persistence()
+    test_batch_defers_save()
+    test_ready_tasks_in_task_order()
+    test_topological_order_stable_across_reload()
+    test_infer_dependencies_order()
+    test_forward_referenced_dependency()
+    test_readd_existing_task()
+    test_add_dependency_after_completion()
+    test_cycle_detection()
+    test_indices_match_after_reload()
     print("✅ All dependency graph tests passed!")
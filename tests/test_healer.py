@@ -0,0 +1,213 @@
+"""Tests for infrastructure healer."""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from cursor_harness import cli
+from cursor_harness.infra import healer as healer_module
+from cursor_harness.infra.healer import InfrastructureHealer
+
+
+def _completed(returncode=0, stdout=b'', stderr=b''):
+    return subprocess.CompletedProcess(args=[], returncode=returncode, stdout=stdout, stderr=stderr)
+
+
+def test_start_docker_with_wait():
+    """Test compose up --wait is a single call when supported."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        healer = InfrastructureHealer(Path(tmpdir))
+
+        with mock.patch.object(subprocess, 'run', return_value=_completed()) as run, \
+                mock.patch.object(healer, '_wait_healthy') as wait_healthy:
+            assert healer._start_docker()
+
+        assert run.call_count == 1
+        assert "--wait" in run.call_args.args[0]
+        assert not wait_healthy.called
+
+
+def test_start_docker_wait_fallback():
+    """Test older compose without --wait falls back to plain up + health polling."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        healer = InfrastructureHealer(Path(tmpdir))
+
+        results = [_completed(1, stderr=b"unknown flag: --wait"), _completed()]
+        with mock.patch.object(subprocess, 'run', side_effect=results) as run, \
+                mock.patch.object(healer, '_wait_healthy') as wait_healthy:
+            assert healer._start_docker()
+
+        assert run.call_args_list[1].args[0] == ["docker", "compose", "up", "-d"]
+        assert wait_healthy.called
+
+        # Any other failure is reported, not retried
+        with mock.patch.object(subprocess, 'run', return_value=_completed(1, stderr=b"no such service")) as run, \
+                mock.patch.object(healer, '_wait_healthy') as wait_healthy:
+            assert not healer._start_docker()
+        assert run.call_count == 1
+        assert not wait_healthy.called
+
+
+def test_wait_healthy_polls_until_healthy():
+    """Test health polling for both compose ps output formats."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        healer = InfrastructureHealer(Path(tmpdir))
+
+        starting = json.dumps([{"Name": "db", "Health": "starting"}]).encode()
+        healthy = b'{"Name": "db", "Health": "healthy"}\n{"Name": "web", "Health": ""}\n'
+        with mock.patch.object(subprocess, 'run', side_effect=[_completed(stdout=starting), _completed(stdout=healthy)]) as run, \
+                mock.patch.object(time, 'sleep') as sleep:
+            healer._wait_healthy()
+
+        assert run.call_count == 2
+        assert sleep.call_args_list == [mock.call(0.25)]
+
+
+def test_alembic_sentinel():
+    """Test migrations are skipped until a migration file is newer than the last upgrade."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        versions = project_dir / "alembic" / "versions"
+        versions.mkdir(parents=True)
+        migration = versions / "001_init.py"
+        migration.write_text("")
+        healer = InfrastructureHealer(project_dir)
+
+        assert healer._migrations_pending()  # Never upgraded here
+
+        with mock.patch.object(subprocess, 'run', return_value=_completed()) as run:
+            assert healer._run_migrations()
+        assert run.call_args.args[0] == ["alembic", "upgrade", "head"]
+        assert healer._alembic_sentinel().exists()
+        assert not healer._migrations_pending()
+
+        later = time.time() + 60
+        os.utime(migration, (later, later))
+        assert healer._migrations_pending()
+
+        # A failed upgrade does not record the new head
+        with mock.patch.object(subprocess, 'run', side_effect=subprocess.CalledProcessError(1, "alembic")):
+            assert not healer._run_migrations()
+        assert healer._migrations_pending()
+
+
+def test_create_buckets_single_call():
+    """Test all buckets are created with one mc mb call."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        healer = InfrastructureHealer(Path(tmpdir))
+
+        with mock.patch.object(subprocess, 'run', return_value=_completed()) as run:
+            assert healer._create_buckets()
+        assert run.call_count == 1
+        assert run.call_args.args[0][-3:] == ["local/diagrams", "local/exports", "local/uploads"]
+
+        with mock.patch.object(subprocess, 'run', return_value=_completed(1, stderr=b"Bucket already exists")):
+            assert healer._create_buckets()
+        with mock.patch.object(subprocess, 'run', return_value=_completed(1, stderr=b"connection refused")):
+            assert not healer._create_buckets()
+
+
+def test_heal_reports_buckets_before_creating_them():
+    """Test the bucket step is announced when it starts, not after it finished."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        healer = InfrastructureHealer(Path(tmpdir))
+        healer._has_docker = True
+
+        def create_buckets():
+            print("creating")
+            return True
+
+        output = io.StringIO()
+        with mock.patch.object(healer, '_minio_running', return_value=True), \
+                mock.patch.object(healer, '_create_buckets', side_effect=create_buckets), \
+                redirect_stdout(output):
+            assert healer.heal()
+
+        lines = output.getvalue().splitlines()
+        assert lines == ["   🔧 Creating buckets...", "creating", "   ✅ Fixed: Buckets"]
+
+        # No MinIO: no bucket step at all
+        output = io.StringIO()
+        with mock.patch.object(healer, '_minio_running', return_value=False), \
+                mock.patch.object(healer, '_create_buckets') as create, \
+                redirect_stdout(output):
+            healer.heal()
+        assert not create.called
+        assert output.getvalue() == ""
+
+
+def test_heal_rechecks_containers():
+    """Test a second heal() on the same healer sees containers that exited since."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        (project_dir / "docker-compose.yml").write_text("services: {}\n")
+        healer = InfrastructureHealer(project_dir)
+        healer._has_docker = True
+
+        with mock.patch.object(subprocess, 'run', return_value=_completed(stdout=b"abc123\n")), \
+                mock.patch.object(healer, '_minio_running', return_value=False), \
+                mock.patch.object(healer, '_start_docker') as start_docker:
+            assert healer.heal()
+        assert not start_docker.called
+
+        with mock.patch.object(subprocess, 'run', return_value=_completed()), \
+                mock.patch.object(healer, '_minio_running', return_value=False), \
+                mock.patch.object(healer, '_start_docker', return_value=True) as start_docker, \
+                redirect_stdout(io.StringIO()):
+            assert healer.heal()
+        assert start_docker.called
+
+
+def test_prewarm_exit_code():
+    """Test prewarm exits non-zero when a fix it attempted failed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        (project_dir / "docker-compose.yml").write_text("services: {}\n")
+        (project_dir / "alembic" / "versions").mkdir(parents=True)
+
+        def run_main(run):
+            with mock.patch.object(healer_module.shutil, 'which', return_value="/usr/bin/docker"), \
+                    mock.patch.object(InfrastructureHealer, '_minio_running', return_value=True), \
+                    mock.patch.object(subprocess, 'run', side_effect=run), \
+                    mock.patch.object(sys, 'argv', ["cursor-harness", "prewarm", tmpdir]), \
+                    redirect_stdout(io.StringIO()):
+                try:
+                    cli.main()
+                except SystemExit as e:
+                    return e.code
+            raise AssertionError("prewarm did not exit")
+
+        def all_fail(cmd, **kwargs):
+            if kwargs.get('check'):
+                raise subprocess.CalledProcessError(1, cmd)
+            return _completed(1, stderr=b"boom")
+
+        def migration_fails(cmd, **kwargs):
+            if cmd[0] == "alembic":
+                raise subprocess.CalledProcessError(1, cmd)
+            return _completed(stdout=b"abc123\n")
+
+        # Nothing running yet: compose up, alembic and mc mb all fail
+        assert run_main(all_fail) == 1
+        # Stack up, only the migration fails
+        assert run_main(migration_fails) == 1
+        assert run_main(lambda cmd, **kwargs: _completed(stdout=b"abc123\n")) == 0
+
+
+if __name__ == '__main__':
+    test_start_docker_with_wait()
+    test_start_docker_wait_fallback()
+    test_wait_healthy_polls_until_healthy()
+    test_alembic_sentinel()
+    test_create_buckets_single_call()
+    test_heal_reports_buckets_before_creating_them()
+    test_heal_rechecks_containers()
+    test_prewarm_exit_code()
+    print("✅ All healer tests passed!")
@@ -0,0 +1,32 @@
+"""Tests for hooks manager."""
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from cursor_harness.hooks import HooksManager
+
+
+def test_existing_hook_scripts_made_executable():
+    """Test setup makes pre-existing, non-executable hook scripts executable."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_dir = Path(tmpdir)
+        (project_dir / "requirements.txt").write_text("pytest\n")
+        hooks_dir = project_dir / "hooks"
+        hooks_dir.mkdir()
+        test_script = hooks_dir / "run-tests.sh"
+        test_script.write_text("old\n")
+        os.chmod(test_script, 0o644)
+
+        HooksManager(project_dir).setup_default_hooks()
+
+        assert stat.S_IMODE(test_script.stat().st_mode) == 0o755
+        assert test_script.read_text().startswith("#!/bin/bash")
+        # Freshly created scripts too, regardless of umask
+        assert stat.S_IMODE((hooks_dir / "coverage-check.sh").stat().st_mode) == 0o755
+
+
+if __name__ == '__main__':
+    test_existing_hook_scripts_made_executable()
+    print("✅ All hooks tests passed!")